@@ -0,0 +1,288 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import numpy as np
+
+#The program files live next door, in the executables folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'executables'))
+
+import PSW_function_library as PSW
+import PSW_executable
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Benchmarks>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following times the hot paths of the program and
+checks its answers against the Mars test case, so that
+speedups from new solvers or rewrites can be compared
+across commits without silently changing the results.
+
+Run it from anywhere via:
+
+	python PSW_benchmarks.py --output benchmark_results.json
+
+Every timing is the best of several repeats, in seconds
+per call. The results are printed and, if an output path
+is given, saved as JSON.
+'''
+
+#The Mars test case inputs & reference output
+test_case_temperature = 4e6 	#Kelvin
+test_case_radius = 228e6 		#km
+test_case_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test_case', 'RK4_solarwind_data_MARS.txt')
+
+
+
+def best_time(function, *args, repeat=5, **kwargs):
+	'''
+	This function times a call, returning the best
+	of several repeats to reduce timing noise.
+
+	Parameters:
+		function: callable to time.
+
+		args, kwargs: arguments to pass to function.
+
+		repeat: int, number of timed calls.
+
+	Returns:
+		seconds: float, fastest time per call [s].
+	'''
+
+	times = []
+	for i in range(repeat):
+		start = time.perf_counter()
+		function(*args, **kwargs)
+		times.append(time.perf_counter() - start)
+
+	return min(times)
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def bench_rk4(N_values, repeat):
+	'''
+	This function times RK4_solar_wind at several
+	numbers of steps N, on every available backend.
+	'''
+
+	r_c = PSW.critical_radius(test_case_temperature)
+	u_c_squared = PSW.coronal_sound_speed(test_case_temperature)
+
+	results = []
+	for backend in PSW.available_backends():
+		#The first call compiles the numba loop, so it is left out of the timing
+		PSW.RK4_solar_wind(1.01*r_c, 1.01*u_c_squared, 1e6, 10, u_c_squared, r_c, backend=backend)
+
+		for N in N_values:
+			seconds = best_time(PSW.RK4_solar_wind, 1.01*r_c, 1.01*u_c_squared, 1e6, N, u_c_squared, r_c, backend=backend, repeat=repeat)
+			results.append({'backend': backend, 'N': N, 'seconds': seconds, 'steps_per_second': N/seconds})
+
+	return results
+
+
+
+def bench_solvers(repeat):
+	'''
+	This function times a full solve out to the orbit
+	of Jupiter with each solver of the executable.
+	'''
+
+	return {solver: best_time(PSW_executable.solve_solar_wind, test_case_temperature, solver, repeat=repeat)
+		for solver in ('RK4', 'RK45', 'analytic')}
+
+
+
+def bench_df_dr(n_calls, repeat):
+	'''
+	This function measures df_dr throughput, both
+	as single scalar calls (as in the RK4 loop) and
+	as one call on an array.
+	'''
+
+	r_c = PSW.critical_radius(test_case_temperature)
+	u_c_squared = PSW.coronal_sound_speed(test_case_temperature)
+	r = np.linspace(1.01*r_c, 766e6, n_calls)
+	f = np.linspace(1.01*u_c_squared, 2e6, n_calls)
+
+	r_list = r.tolist()
+	f_list = f.tolist()
+
+	def scalar_calls():
+		for i in range(n_calls):
+			PSW.df_dr(r_list[i], f_list[i], u_c_squared, r_c)
+
+	scalar_seconds = best_time(scalar_calls, repeat=repeat)
+	array_seconds = best_time(PSW.df_dr, r, f, u_c_squared, r_c, repeat=repeat)
+
+	return {'n': n_calls, 'scalar_calls_per_second': n_calls/scalar_seconds, 'array_values_per_second': n_calls/array_seconds}
+
+
+
+def bench_lookup(grid_sizes, n_queries, repeat):
+	'''
+	This function times closest_points (one radius
+	per call) and speed_at (all radii in one call)
+	on growing r grids.
+	'''
+
+	rng = np.random.default_rng(0)
+
+	results = []
+	for size in grid_sizes:
+		r_values = np.linspace(1e6, 766e6, size)
+		u_values = np.sqrt(r_values)
+		radii = rng.uniform(r_values[0], r_values[-1], n_queries)
+
+		closest_seconds = best_time(PSW.closest_points, r_values, radii[0], repeat=repeat)
+		speed_at_seconds = best_time(PSW.speed_at, radii, r_values, u_values, repeat=repeat)
+		pchip_seconds = best_time(PSW.speed_at, radii, r_values, u_values, 'pchip', repeat=repeat)
+
+		results.append({'grid_size': size, 'closest_points_seconds_per_query': closest_seconds,
+			'speed_at_seconds_per_query': speed_at_seconds/n_queries, 'speed_at_pchip_seconds_per_query': pchip_seconds/n_queries})
+
+	return results
+
+
+
+def bench_spiral(grid_sizes, repeat):
+	'''
+	This function times euler_method_parker, and the
+	eight line parker_spiral, on growing r grids.
+	'''
+
+	results = []
+	for size in grid_sizes:
+		r_values = np.linspace(1e6, 766e6, size)
+		u_values = np.full(size, 400.0)
+
+		results.append({'grid_size': size,
+			'euler_method_parker_seconds': best_time(PSW.euler_method_parker, 2.7e-6, r_values, u_values, repeat=repeat),
+			'parker_spiral_seconds': best_time(PSW.parker_spiral, 2.7e-6, r_values, u_values, repeat=repeat)})
+
+	return results
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def check_accuracy():
+	'''
+	This function compares the program output with
+	the Mars test case (4 million K, 228 million km).
+
+	The RK4 data file is written with integer
+	precision, so the RK4 solution must agree with it
+	exactly once truncated the same way. The other
+	solvers are reported as their largest difference
+	in speed to the RK4 reference [km s^-1].
+
+	Returns:
+		accuracy: dict, the comparison for each solver,
+		with 'passed' False if RK4 no longer matches.
+	'''
+
+	reference = np.loadtxt(test_case_data, delimiter=',')
+	reference_speed = PSW.speed_at(test_case_radius, reference[:, 0], reference[:, 1])
+
+	accuracy = {'reference_speed_at_228e6_km': float(reference_speed)}
+
+	for solver in ('RK4', 'RK45', 'analytic'):
+		r_vals, u_vals = PSW_executable.solve_solar_wind(test_case_temperature, solver)
+		r_vals = np.asarray(r_vals)
+		u_vals = np.asarray(u_vals)
+
+		#Comparing over the reference radii, which every solver covers
+		inside = (reference[:, 0] >= r_vals[0]) & (reference[:, 0] <= r_vals[-1])
+		u_difference = PSW.speed_at(reference[inside, 0], r_vals, u_vals) - reference[inside, 1]
+
+		result = {'speed_at_228e6_km': float(PSW.speed_at(test_case_radius, r_vals, u_vals)),
+			'max_abs_speed_difference': float(np.max(np.abs(u_difference)))}
+
+		if solver == 'RK4':
+			truncated = np.column_stack((r_vals, u_vals)).astype(np.int64)
+			result['matches_reference_file'] = bool(truncated.shape == reference.shape and np.array_equal(truncated, reference))
+
+		accuracy[solver] = result
+
+	accuracy['passed'] = accuracy['RK4']['matches_reference_file']
+
+	return accuracy
+
+
+
+def run(quick=False):
+	'''
+	This function runs every benchmark and the
+	accuracy check.
+
+	Parameters:
+		quick: bool, if True uses fewer repeats and
+		smaller sizes, for a fast smoke test.
+
+	Returns:
+		report: dict, all results along with the
+		commit and environment they were run on.
+	'''
+
+	repeat = 2 if quick else 5
+
+	try:
+		commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+			cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+	except OSError:
+		commit = None
+
+	report = {
+		'commit': commit,
+		'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+		'python': platform.python_version(),
+		'numpy': np.__version__,
+		'machine': platform.machine(),
+		'accuracy': check_accuracy(),
+		'RK4_solar_wind': bench_rk4([500, 5000] if quick else [500, 5000, 50000], repeat),
+		'solve_solar_wind': bench_solvers(repeat),
+		'df_dr': bench_df_dr(10000 if quick else 100000, repeat),
+		'lookup': bench_lookup([1000, 10000] if quick else [1000, 10000, 100000, 1000000], 1000, repeat),
+		'euler_method_parker': bench_spiral([1000, 10000] if quick else [1000, 10000, 100000, 1000000], repeat),
+	}
+
+	return report
+
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Benchmarks & accuracy checks for the ParkerSolarWind program.')
+	parser.add_argument('--output', default=None, help='JSON file to save the results to')
+	parser.add_argument('--quick', action='store_true', help='fewer repeats and smaller sizes')
+	args = parser.parse_args()
+
+	report = run(args.quick)
+
+	print(json.dumps(report, indent=2))
+
+	if args.output is not None:
+		with open(args.output, 'w') as file:
+			json.dump(report, file, indent=2)
+
+	if not report['accuracy']['passed']:
+		sys.exit('Oops! The RK4 output no longer matches the Mars test case!')
@@ -0,0 +1,231 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+from collections import OrderedDict
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Solution Cache>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following keeps recently computed RK4 solutions
+in memory, so that asking for the same coronal
+temperature again skips the integration entirely.
+
+Solutions are keyed by every input of the RK4 solve:
+the temperature, the step size h, the number of steps
+N, and the 1.01 start offsets of r and f. Once the
+stored trajectories exceed the memory budget, the least
+recently used ones are dropped first.
+'''
+
+
+
+class SolutionCache:
+	'''
+	A least recently used (LRU) cache of RK4
+	solar wind solutions.
+
+	Parameters:
+		max_bytes: int, memory budget for the
+		stored r and u arrays, in bytes.
+
+	Attributes:
+		hits, misses, evictions: ints, counts of
+		lookups answered from the cache, lookups
+		that needed a new integration, and
+		solutions dropped to stay within budget.
+
+		nbytes: int, memory currently used by
+		the stored solutions, in bytes.
+	'''
+
+	def __init__(self, max_bytes=256 * 1024**2):
+		self.max_bytes = max_bytes
+		self.nbytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._solutions = OrderedDict()
+
+
+	def _key(self, T, h, N, r0_factor, f0_factor):
+		'''
+		This function gives the cache key of a solve.
+		N may be None, for solves that stop at a
+		radius rather than after a number of steps.
+		'''
+
+		return (float(T), float(h), None if N is None else int(N), float(r0_factor), float(f0_factor))
+
+
+	def get(self, T, h=1e6, N=5000, r0_factor=1.01, f0_factor=1.01):
+		'''
+		This function looks up a stored solution
+		without ever integrating. See solve for the
+		parameters.
+
+		Returns:
+			r_vals, u_vals: numpy arrays (read only),
+			or None if the solution is not stored.
+		'''
+
+		key = self._key(T, h, N, r0_factor, f0_factor)
+
+		if key not in self._solutions:
+			self.misses += 1
+			return None
+
+		self.hits += 1
+		self._solutions.move_to_end(key)	#now the most recently used
+
+		return self._solutions[key]
+
+
+	def put(self, r_vals, u_vals, T, h=1e6, N=5000, r0_factor=1.01, f0_factor=1.01):
+		'''
+		This function stores a solution computed
+		elsewhere (e.g. in another thread) under the
+		key of its inputs. See solve for the parameters.
+
+		Returns:
+			r_vals, u_vals: the stored, read only copies.
+		'''
+
+		r_vals = np.array(r_vals, dtype=float)
+		u_vals = np.array(u_vals, dtype=float)
+
+		#Shared between callers, so nobody may modify them in place
+		r_vals.setflags(write=False)
+		u_vals.setflags(write=False)
+
+		self._store(self._key(T, h, N, r0_factor, f0_factor), (r_vals, u_vals))
+
+		return r_vals, u_vals
+
+
+	def solve(self, T, h=1e6, N=5000, r0_factor=1.01, f0_factor=1.01):
+		'''
+		This function returns the RK4 solution for
+		the given inputs, integrating only if it is
+		not already stored.
+
+		Parameters:
+			T: float, coronal temperature in Kelvin.
+
+			h: float, step size [km]
+
+			N: int, number of steps, or None to take
+			just enough steps to pass the orbit of
+			Jupiter and cut the solution there, keeping
+			the first point at or past it (as the
+			PSW_service does).
+
+			r0_factor, f0_factor: floats, initial
+			radius and speed squared in units of
+			the critical radius and coronal sound
+			speed squared.
+
+		Returns:
+			r_vals, u_vals: numpy arrays (read only),
+			radial distance values [km] and solar
+			wind speed values [km s^-1].
+		'''
+
+		solution = self.get(T, h, N, r0_factor, f0_factor)
+
+		if solution is not None:
+			return solution
+
+		if N is None:
+			r_c = PSW.critical_radius(T)
+			u_c_squared = PSW.coronal_sound_speed(T)
+
+			r_vals, f_vals = PSW.RK4_solar_wind(r0_factor*r_c, f0_factor*u_c_squared, h, None, u_c_squared, r_c, PSW.jupiter_radius)
+			r_vals, u_vals = PSW.trim_to_radius(r_vals, f_vals, PSW.jupiter_radius, include_edge=True)
+
+			return self.put(r_vals, u_vals, T, h, N, r0_factor, f0_factor)
+
+		r_vals, u_vals = PSW.RK4_solar_wind_batch(T, h, N, r0_factor, f0_factor)
+
+		return self.put(r_vals[0], u_vals[0], T, h, N, r0_factor, f0_factor)
+
+
+	def speed_at(self, T, radii, h=1e6, N=5000, r0_factor=1.01, f0_factor=1.01, method='linear'):
+		'''
+		This function finds the solar wind speed at
+		the given radii via the (cached) RK4 solution
+		for temperature T. See solve and
+		PSW_function_library.speed_at for parameters.
+
+		Returns:
+			u: float or numpy array, solar wind speed at
+			each input radius [km s^-1].
+		'''
+
+		r_vals, u_vals = self.solve(T, h, N, r0_factor, f0_factor)
+
+		return PSW.speed_at(radii, r_vals, u_vals, method)
+
+
+	def _store(self, key, solution):
+		'''
+		This function adds a solution and evicts the
+		least recently used ones until the cache is
+		back within its memory budget. A solution
+		larger than the whole budget is not stored.
+		'''
+
+		size = sum(array.nbytes for array in solution)
+
+		#Replacing a solution that is already stored, rather than counting it twice
+		if key in self._solutions:
+			self.nbytes -= sum(array.nbytes for array in self._solutions.pop(key))
+
+		if size > self.max_bytes:
+			return
+
+		self._solutions[key] = solution
+		self.nbytes += size
+
+		while self.nbytes > self.max_bytes:
+			old_key, old_solution = self._solutions.popitem(last=False)
+			self.nbytes -= sum(array.nbytes for array in old_solution)
+			self.evictions += 1
+
+
+	def clear(self):
+		'''
+		This function drops every stored solution
+		and resets the counters.
+		'''
+
+		self._solutions.clear()
+		self.nbytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+	def stats(self):
+		'''
+		This function summarizes the cache usage.
+
+		Returns:
+			stats: dict, the hits, misses, evictions,
+			number of stored solutions and memory used.
+		'''
+
+		return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+			'entries': len(self._solutions), 'nbytes': self.nbytes, 'max_bytes': self.max_bytes}
+
+
+	def __len__(self):
+		return len(self._solutions)
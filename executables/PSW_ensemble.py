@@ -0,0 +1,212 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import PSW_sweep
+import numpy as np
+import argparse
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Ensemble>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following treats the coronal temperature as
+uncertain: it draws an ensemble of temperatures from
+a distribution, solves the Parker Solar Wind Equation
+for every member, and summarises the spread of the
+results as percentile bands, both of the whole u(r)
+profile and of the speed at one radial distance.
+
+Every member is solved via the parameter sweep of
+PSW_sweep, so the RK4 members of a chunk are all
+integrated together in one batch, and chunks may be
+spread over several worker processes.
+
+Run it from the command line via e.g.:
+
+	python PSW_ensemble.py --members 500 --mean 2e6 --sigma 0.5e6 --radius 200e6
+'''
+
+
+
+def sample_temperatures(n_members, mean=2e6, sigma=0.5e6, distribution='normal', seed=None):
+	'''
+	This function draws coronal temperatures for
+	the members of an ensemble, all within the
+	0.5 million K to 4 million K limits of the model.
+
+	Parameters:
+		n_members: int, number of temperatures to draw.
+
+		mean: float, centre of the distribution [K]
+
+		sigma: float, spread of the distribution [K].
+		For 'normal' this is the standard deviation,
+		for 'uniform' the half width.
+
+		distribution: str, 'normal' (redrawing any
+		value outside the limits, i.e. a truncated
+		normal) or 'uniform' (clipped to the limits).
+
+		seed: int, seed of the random numbers, so an
+		ensemble can be repeated exactly.
+
+	Returns:
+		temperatures: numpy array, coronal
+		temperatures in Kelvin.
+	'''
+
+	rng = np.random.default_rng(seed)
+
+	if distribution == 'normal':
+		if not PSW.T_min <= mean <= PSW.T_max:
+			raise Exception('Oops! The mean temperature must lie between 0.5 million K and 4 million K!')
+
+		temperatures = rng.normal(mean, sigma, n_members)
+
+		#Redrawing the members that fell outside the limits
+		outside = (temperatures < PSW.T_min) | (temperatures > PSW.T_max)
+		while outside.any():
+			temperatures[outside] = rng.normal(mean, sigma, outside.sum())
+			outside = (temperatures < PSW.T_min) | (temperatures > PSW.T_max)
+
+	elif distribution == 'uniform':
+		low = max(mean - sigma, PSW.T_min)
+		high = min(mean + sigma, PSW.T_max)
+
+		if low > high:
+			raise Exception('Oops! Your temperature range lies outside 0.5 million K to 4 million K!')
+
+		temperatures = rng.uniform(low, high, n_members)
+
+	else:
+		raise Exception('Oops! Your distribution choice is not one of our available options!')
+
+	return temperatures
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def ensemble(temperatures, radial_distance, percentiles=(5, 25, 50, 75, 95), solver='RK4', h=1e6,
+	n_r=500, r_max=PSW.jupiter_radius, max_workers=1):
+	'''
+	This function solves the Parker Solar Wind
+	Equation for every member of an ensemble and
+	gathers percentile bands of the results.
+
+	The u(r) bands are found on a grid of radii
+	spaced geometrically from the largest starting
+	radius of the members (1.01 times the critical
+	radius of the coolest member) out to r_max, so
+	that every member covers every radius of it.
+
+	Parameters:
+		temperatures: numpy array, coronal temperatures
+		of the members in Kelvin, e.g. from
+		sample_temperatures.
+
+		radial_distance: float, radius at which to find
+		the spread of solar wind speeds [km]
+
+		percentiles: sequence of floats, the percentiles
+		(0 to 100) making up the bands.
+
+		solver: str, 'RK4', 'RK45' or 'analytic', as in
+		the PSW_executable.
+
+		h: float, RK4 step size [km]
+
+		n_r: int, number of radii in the u(r) bands.
+
+		r_max: float, outer edge of the u(r) bands [km]
+
+		max_workers: int, number of worker processes,
+		see PSW_sweep.sweep. The default of 1 keeps
+		every RK4 member in one batch, which is fastest
+		for a few thousand members or less.
+
+	Returns:
+		results: dict, with
+			'temperatures': the member temperatures [K]
+			'percentiles': the percentiles of the bands
+			'r_grid': radii of the u(r) bands [km]
+			'u_bands': array of shape (len(percentiles),
+			n_r), the u(r) bands [km s^-1]
+			'speeds': every member's speed at
+			radial_distance [km s^-1]
+			'speed_bands': the percentiles of 'speeds'
+	'''
+
+	temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+	percentiles = np.asarray(percentiles, dtype=float)
+
+	r_0 = 1.01 * PSW.critical_radius(temperatures)
+	r_grid = np.geomspace(r_0.max(), r_max, n_r)
+
+	if not r_0.max() <= radial_distance <= r_max:
+		raise Exception('Oops! Your radial distance lies inside the starting radius of a member, or past r_max!')
+
+	#Enough steps for the innermost starting (hottest) member to reach r_max
+	N = PSW.steps_to_radius(r_0.min(), r_max, h)
+
+	#The bands & the single radius solved together, as one sweep
+	radii = np.append(r_grid, radial_distance)
+	speeds = PSW_sweep.sweep(temperatures, radii, solver, h, N, max_workers)['speed'].reshape(len(temperatures), len(radii))
+
+	return {'temperatures': temperatures, 'percentiles': percentiles, 'r_grid': r_grid,
+		'u_bands': np.percentile(speeds[:, :-1], percentiles, axis=0),
+		'speeds': speeds[:, -1], 'speed_bands': np.percentile(speeds[:, -1], percentiles)}
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def main(argv=None):
+	'''
+	This function runs an ensemble from the command
+	line, printing the percentiles of the speed at
+	the input radius and optionally saving every
+	result to a .npz file.
+	'''
+
+	parser = argparse.ArgumentParser(description='Ensemble of Parker Solar Wind solutions over uncertain coronal temperatures.')
+
+	parser.add_argument('-n', '--members', type=int, default=500, help='number of ensemble members')
+	parser.add_argument('--mean', type=float, default=2e6, help='mean coronal temperature [K]')
+	parser.add_argument('--sigma', type=float, default=0.5e6, help='spread of the coronal temperature [K]')
+	parser.add_argument('--distribution', choices=['normal', 'uniform'], default='normal', help='temperature distribution')
+	parser.add_argument('-r', '--radius', type=float, default=200e6, help='radial distance [km]')
+	parser.add_argument('--solver', choices=['RK4', 'RK45', 'analytic'], default='RK4', help='integration method')
+	parser.add_argument('--seed', type=int, default=None, help='random seed, for repeatable ensembles')
+	parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+	parser.add_argument('--output', default=None, help='.npz file to save the bands & member speeds to')
+
+	args = parser.parse_args(argv)
+
+	temperatures = sample_temperatures(args.members, args.mean, args.sigma, args.distribution, args.seed)
+	results = ensemble(temperatures, args.radius, solver=args.solver, max_workers=args.workers)
+
+	print('Solar Wind Speed percentiles at a distance of', args.radius, 'km from the Sun:')
+	for percentile, speed in zip(results['percentiles'], results['speed_bands']):
+		print(f'  {percentile:5.1f}%: {speed:.3f} km s^-1')
+
+	if args.output is not None:
+		np.savez(args.output, **results)
+
+	return results
+
+
+
+if __name__ == '__main__':
+	main()
@@ -3,9 +3,12 @@
 
 
 import PSW_function_library as PSW
+import PSW_store
+import PSW_export
+import PSW_instrumentation as instrument
 import numpy as np
 from math import *
-import matplotlib.pyplot as plt
+import argparse
 
 
 
@@ -13,361 +16,556 @@ import matplotlib.pyplot as plt
 #
 # Parker Solar Wind Model, Final Project
 # File: <Main Executable>
-# Author: <Kaycee Conder> 
+# Author: <Kaycee Conder>
 # Spring 2025 ASTR4610
 #
 ################################################################
 
 # ----------------
-# Input Parameters 
+# Input Parameters
 # ----------------
 
 '''The following section is where you will modify your input values
-for the program. Please note the restrictions on each of the input 
+for the program. Please note the restrictions on each of the input
 values, indicated by the 'Range' note next to each input. Your value
 MUST exist within this range or the program will return an exception.
 
 The coronal temperature range spans the plausible/phyiscally significant
-temperatures of the corona. 
+temperatures of the corona.
 
-The radial distance range spans the location of the Critical Radius, 
-defined as Equation 1 in the README file, to the orbit of Jupiter. 
+The radial distance range spans the location of the Critical Radius,
+defined as Equation 1 in the README file, to the orbit of Jupiter.
+
+Each of these values is only a default, and can also be given on the
+command line (run 'python PSW_executable.py --help' for the options).
 '''
 
 #The temperature of the Corona of the Sun.
 corona_temperature = 4e6 #Kelvin, Range: 0.5e6 K to 4e6 K
 
-#The distance at which you want to find the speed of the solar wind.
+#The distance(s) at which you want to find the speed of the solar wind.
+#A single value, a body name ('Venus', 'Earth', 'Mars', 'Jupiter'), or a list of either.
 radial_distance = 200e6 #Kilometers, Range: Critical Radius to 766.44e6 km
 
+#The integration method used to solve the Parker Solar Wind Equation.
+solver = 'RK4' #Options: 'RK4' (fixed step size), 'RK45' (adaptive step size), 'analytic' (exact Lambert W solution)
+
 #Location where you want to save all output files.
 output_filepath_RK4 ='/d/cha1/kconder/PHYS4840_labs/final_project/RK4_solarwind_data.txt'	#RK4 solar wind data location
+output_filepath_binary = '/d/cha1/kconder/PHYS4840_labs/final_project/RK4_solarwind_data.npy'	#full precision binary copy of the solar wind data
+output_filepath_export = None	#optional columnar copy of the data (.parquet or .arrow, .npz without pyarrow)
 output_filepath_PSW_graph = '/d/cha1/kconder/PHYS4840_labs/final_project/parker_solar_wind_plot.png'	#Parker Solar Wind results plot
 output_filepath_p_spiral = '/d/cha1/kconder/PHYS4840_labs/final_project/parker_spiral_plot.png'	#parker Spiral results plot
 
-# ----------------------
-# Determining Key Values
-# ----------------------
-
-'''
-The following utilizes previously established
-definitions from the PSW_function_library to 
-find the following quantities. These values 
-are necessary to integrate the Parker Solar 
-Wind Equation & find the dependence of solar 
-wind speed [km s^-1] on distance from the Sun 
-[km]: 
-
-Critical Radius: Radius at which solar wind
-transitions from subsonic to supersonic speed.
-Units of kilometers. 
-
-Coronal Sound Speed: Speed at which sound
-waves travel through the Sun's Corona. 
-Specifically gives this speed squared. Units
-of km^2 s^-2.
-'''
-
-r_c = PSW.critical_radius(corona_temperature) #critical radius
-u_c_squared = PSW.coronal_sound_speed(corona_temperature) #coronal sound speed
+#Fixed settings of the model
+h = 1e6 					#RK4 step size [km]
+N = None 					#number of RK4 steps, None takes just enough to pass the outer radius
+solar_omega = 2.7e-6 		#Solar angular velocity [rad s^-1]
 
 # ------------------------------
 # Integrating Via Runge Kutta 4
 # ------------------------------
 
-'''
-The following utilizes the Runge Kutta 4 
-method of solving ODEs to find the 
-dependence of solar winid on distance from 
-the Sun. 
-
-An output file will be generated via your
-given filepath in the 'Input Parameters' 
-Section 
-'''
+def solve_solar_wind(T, solver='RK4', h=h, N=N, r_stop=PSW.jupiter_radius, include_edge=False, return_steps=False):
+	'''
+	This function solves the Parker Solar Wind
+	Equation for one coronal temperature, via
+	the chosen solver, out to the orbit of Jupiter.
+
+	The following utilizes previously established
+	definitions from the PSW_function_library to
+	find the Critical Radius (radius at which solar
+	wind transitions from subsonic to supersonic
+	speed, in km) and the Coronal Sound Speed
+	(speed at which sound waves travel through the
+	Sun's Corona, squared, in km^2 s^-2). These are
+	necessary to integrate the Parker Solar Wind
+	Equation.
+
+	Parameters:
+		T: float, coronal temperature in Kelvin,
+		between 0.5 million K and 4 million K.
+
+		solver: str, 'RK4' (fixed step size), 'RK45'
+		(adaptive step size) or 'analytic' (exact
+		Lambert W solution).
+
+		h: float, RK4 step size [km]
+
+		N: int, number of RK4 steps, or None to
+		take just enough steps to pass r_stop.
+
+		r_stop: float, radius [km] at which the
+		integration stops once it has passed it.
+		Defaults to the orbit of Jupiter; setting it
+		to the radius being queried skips all work
+		beyond it.
+
+		include_edge: bool, if True the first point
+		at or past the orbit of Jupiter is kept too,
+		so that speeds can be found right out to it.
+
+		return_steps: bool, if True the number of
+		steps actually taken is returned as well.
+
+	Returns:
+		r_vals, u_vals: numpy arrays, radial distance
+		values [km] and solar wind speed values
+		[km s^-1] inside the orbit of Jupiter.
+
+		steps: int, number of steps taken before the
+		cut at the orbit of Jupiter, only if
+		return_steps is True.
+	'''
 
-#Setting initial conditions
+	r_c = PSW.critical_radius(T) #critical radius
+	u_c_squared = PSW.coronal_sound_speed(T) #coronal sound speed
 
-r_0 = r_c * 1.01			#initial radial distance, critical radius
-f_0 = u_c_squared * 1.01	#initial velocity squared, coronal sound speed (where f=u^2)
-h = 1e6 					#step size
-N = 5000 					#number of steps 
+	#Setting initial conditions
+	r_0 = r_c * 1.01			#initial radial distance, critical radius
+	f_0 = u_c_squared * 1.01	#initial velocity squared, coronal sound speed (where f=u^2)
 
-def RK4_solar_wind(r0, f0, h, N):
-	'''
-	This function utilzies the RK4 method 
-	of integration to find the dependence 
-	of solar wind speed on distance from 
-	the Sun. 
+	#Performing the integration via the chosen solver
+	with instrument.stage('integrate'):
+		if solver == 'RK45':
+			#Adaptive step sizes, integrating straight out to the orbit of Jupiter (or r_stop)
+			r_vals_initial, f_vals_initial = PSW.RK45_solar_wind(r_0, f_0, min(r_stop, PSW.jupiter_radius), u_c_squared, r_c)
 
-	Here, our function to integrate is
-	defined in the PSW_function_library. 
+		elif solver == 'RK4':
+			r_vals_initial, f_vals_initial = PSW.RK4_solar_wind(r_0, f_0, h, N, u_c_squared, r_c, r_stop)
 
-	Parameters: 
-		r0: float, initial radial distance [km]
+		elif solver == 'analytic':
+			#Closed form transonic solution, evaluated on the same r grid as RK4
+			N_steps = PSW.steps_to_radius(r_0, r_stop, h) if N is None else min(N, PSW.steps_to_radius(r_0, r_stop, h))
+			r_vals_initial = r_0 + h*np.arange(N_steps+1)
+			f_vals_initial = PSW.parker_analytic(r_vals_initial, u_c_squared, r_c)**2
 
-		f0: float, initial solar wind speed 
-		squared [km^2 s^-2]
+		else:
+			raise Exception('Oops! Your solver choice is not one of our available options!')
 
-		h: float, step size
+	#Constraining our r values to inside the orbit of Juptier, and finding the solar wind speed from speed squared
+	with instrument.stage('jupiter_cutoff'):
+		r_vals, u_vals = PSW.trim_to_radius(r_vals_initial, f_vals_initial, PSW.jupiter_radius, include_edge)
 
-		N = int, number of steps
+	if return_steps:
+		return r_vals, u_vals, len(r_vals_initial) - 1
+
+	return r_vals, u_vals
 
-	Returns: 
-		r_vals, u_vals: numpy arrays, radial distance 
-		values and solar wind speed values squared 
-		[km] and [km^2 s^-2].
-	'''
 
-	r_vals = [r0]
-	f_vals = [f0]
-	r = r0
-	f = f0 
 
-	for i in range(N): 
-		k1 = h * PSW.df_dr(r,f, u_c_squared, r_c)
-		k2 = h * PSW.df_dr(r+0.5*h, f+0.5*k1, u_c_squared, r_c)
-		k3 = h * PSW.df_dr(r+0.5*h, f+0.5*k2, u_c_squared, r_c)
-		k4 = h * PSW.df_dr(r+ h, f+ k3, u_c_squared, r_c)
+def write_solution(r_vals, u_vals, T, solver, text_path, binary_path=None, h=None, N=None, export_path=None):
+	'''
+	This function saves the solar wind data as a
+	two column text file, and optionally as a full
+	precision binary copy via the PSW_store.
 
-		f += (k1 + 2*k2 + 2*k3 + k4) /6
-		r += h 
+	Parameters:
+		r_vals, u_vals: lists or numpy arrays, radial
+		distance values [km] and solar wind speed
+		values [km s^-1].
 
+		T: float, coronal temperature in Kelvin.
 
-		r_vals.append(r)
-		f_vals.append(f)
+		solver: str, name of the solver used.
 
+		text_path: str, location of the text file.
 
-	return np.array(r_vals), np.array(f_vals)
+		binary_path: str, location of the binary
+		.npy file, or None to skip it.
 
-#Performing the integration via the above definition
-r_vals_initial, f_vals_initial = RK4_solar_wind(r_0, f_0, h, N)
+		h, N: float & int, step size [km] and number
+		of steps, recorded in the binary metadata.
 
-#Constraining our r values to inside the orbit of Juptier 
-r_vals = []
-u_vals = []
+		export_path: str, location of a columnar
+		.parquet or .arrow copy (see PSW_export),
+		or None to skip it.
+	'''
 
-for i in range(len(r_vals_initial)):
-	if r_vals_initial[i] < 766.44e6:
-		r_vals.append(r_vals_initial[i])
-		u_vals.append(sqrt(f_vals_initial[i])) #finding the solar wind speed from solar wind speed squared (RK4 output)
+	with instrument.stage('savetxt'):
+		RK4_sw_data = np.column_stack((r_vals, u_vals)) #generating columns
+		np.savetxt(text_path, RK4_sw_data, header='R Values [km] U Values [km s^-1]', delimiter=',', fmt='%d')
 
+	if binary_path is not None:
+		with instrument.stage('save_binary'):
+			PSW_store.save_solution(binary_path, r_vals, u_vals, T, h, N, solver) #float64 .npy & .json metadata
 
-#Saving data to data file 
-RK4_sw_data = np.column_stack((r_vals, u_vals)) #generating columns 
-np.savetxt(output_filepath_RK4, RK4_sw_data, header='R Values [m] U Values [m s^-1]', delimiter=',', fmt='%d')
+	if export_path is not None:
+		with instrument.stage('export'):
+			PSW_export.export_trajectory(export_path, r_vals, u_vals, T, solver, h, N) #columnar table for dataframe engines
 
-# -------------
-# Interpolation
-# -------------
 
-'''
-The following uses methods of linear interpolation
-to find the solar wind speed at our input radial 
-distance. 
-'''
 
-#First finding the closest RK4 r-values to our input r-value. 
-#Specifically, the points directly to the left and to the right. 
-left_point, right_point = PSW.closest_points(r_vals, radial_distance)
+# -----------------------------------
+# Printing & Visualizing Final Answer
+# -----------------------------------
 
+def load_pyplot(backend=None):
+	'''
+	This function imports matplotlib only once a plot
+	is actually requested, so compute only runs never
+	pay for it or touch a display.
 
-def interpolating(left_point, right_point, r_values, u_values, my_rval):
+	Parameters:
+		backend: str, matplotlib backend to use, e.g.
+		'Agg' to render straight to file without a
+		display. None keeps matplotlib's default.
+
+	Returns:
+		plt: the matplotlib.pyplot module.
 	'''
-	This function utilizes properties of a line via two points and
-	linear interpolation to find the solar wind speed for our input 
-	r-value. 
 
-	Parameters: 
-		left_point: float, left point straddling input r-value [km]
+	import matplotlib
+
+	if backend is not None:
+		matplotlib.use(backend)
 
-		right_point: float, right piont straddling input r-value [km]
+	import matplotlib.pyplot as plt
 
-		r_values: numpy array, set of r-values from RK4 integration [km]
+	return plt
 
-		u_values: numpy array, set of u-values from RK4 integration [km s^-1]
 
-		my_rval: float, input r-value [km]
 
-	Returns: 
-		my_uval: float, solar wind speed at input radius
+def plot_solar_wind(r_vals, u_vals, r_c, radial_distance, input_solar_wind_speed, output_path, backend=None, show=False):
 	'''
+	This function graphs out the value of our
+	solar wind speed at the input r-value, relative
+	to the rest of the generated speeds and distances
+	from our RK4 integration.
 
-	#Index of our closes points 
-	left_index = r_values.index(left_point)
-	right_index = r_values.index(right_point)
+	Parameters:
+		r_vals, u_vals: lists or numpy arrays, radial
+		distance values [km] and solar wind speed
+		values [km s^-1].
 
-	#Setting arrays with closest r and u values 
-	closest_r = np.array([left_point, right_point], dtype=float)
-	closest_u = np.array([float(u_values[left_index]), float(u_values[right_index])])
+		r_c: float, critical radius [km]
 
-	#Finding slope and interept of line b/w points straddling input r-value 
-	slope, intercept = PSW.linear_properties(left_point, right_point, closest_u[0], closest_u[1])
+		radial_distance: float, input radius [km]
 
-	#Finding u-value corresponding to input r-value via y=mx+b
-	my_uval = PSW.y_from_line(my_rval, slope, intercept)
+		input_solar_wind_speed: float, solar wind
+		speed at the input radius [km s^-1]
 
+		output_path: str, location of the .png file.
 
-	return my_uval
+		backend: str, matplotlib backend, see load_pyplot.
 
-#Finding our solar wind speed!
-input_solar_wind_speed = interpolating(left_point, right_point, r_vals, u_vals, radial_distance)
+		show: bool, if True the figure is also shown
+		on screen, which waits for the window to close.
+	'''
 
-# -----------------------------------
-# Printing & Visualizing Final Answer
-# -----------------------------------
+	plt = load_pyplot(backend)
 
-'''
-The following prints and graphs out the value of our 
-solar wind speed at the input r-value, relative to the 
-rest of the generated speeds and distances from our RK4 
-integration.
-'''
+	#Setting font to Times New Roman for our plots
+	plt.rcParams['font.family']= 'serif'
+	plt.rcParams['font.serif'] = ['Times New Roman'] + plt.rcParams['font.serif']
+
+	#Plotting our velocity & distance distribution
 
-#Printing out the final answer 
-print('Solar Wind Speed at a distance of', radial_distance, 'km from the Sun =', input_solar_wind_speed ,'km s^-1')
+	fig, ax = plt.subplots()
 
-#Setting font to Times New Roman for our plots
-plt.rcParams['font.family']= 'serif'
-plt.rcParams['font.serif'] = ['Times New Roman'] + plt.rcParams['font.serif']
+	ax.plot(r_vals, u_vals, color='darkgreen')
+	ax.axvline(radial_distance, 0, 1200, linestyle='dashed', color='indigo', label=f'Input Radius, {(radial_distance)} km')
+	ax.axvline(r_c, 0, 1200, linestyle='dotted', color='maroon', label=f'Critical Radius, {round(r_c,3)} km')
+	ax.scatter(radial_distance, input_solar_wind_speed, color='purple', marker='*', label=f'Speed at Input Radius = {round(input_solar_wind_speed,3)} km/s$^2$', s=100)
+	ax.axvline(PSW.planet_radii['Earth'], 0, 1200, linestyle='dotted', color='cadetblue', label='Earth Distance, 149$^{10}$ km')
+	ax.set_xlabel('Radial Distance From Sun [km]')
+	ax.set_ylabel('Solar Wind Speed [km/s]')
+	ax.legend()
 
-#Plotting our velocity & distance distribution 
+	plt.savefig(output_path)
 
-fig, ax = plt.subplots()
+	if show:
+		plt.show()
 
-ax.plot(r_vals, u_vals, color='darkgreen')
-ax.axvline(radial_distance, 0, 1200, linestyle='dashed', color='indigo', label=f'Input Radius, {(radial_distance)} km')
-ax.axvline(r_c, 0, 1200, linestyle='dotted', color='maroon', label=f'Critical Radius, {round(r_c,3)} km')
-ax.scatter(radial_distance, input_solar_wind_speed, color='purple', marker='*', label=f'Speed at Input Radius = {round(input_solar_wind_speed,3)} km/s$^2$', s=100)
-ax.axvline(149e6, 0, 1200, linestyle='dotted', color='cadetblue', label='Earth Distance, 149$^{10}$ km')
-ax.set_xlabel('Radial Distance From Sun [km]')
-ax.set_ylabel('Solar Wind Speed [km/s]')
-ax.legend()
+	plt.close(fig)
 
-plt.savefig(output_filepath_PSW_graph)
-#plt.show()
 
 
 # ----------------
-# Parker Spiral 
+# Parker Spiral
 # ----------------
 
-'''
-The following is not integral to the calculation
-of the solar wind speed at the input radial distnace, 
-however, it provides an additional visualization via
-The Parker Spiral. The Parker Spiral is discussed 
-in further detail in the README file, but in essence, 
-it depicts the dispersion of the Sun's Mangetic field 
-given its rotation speed and the velocity of the solar 
-wind (calculated in the above sections).
+def plot_parker_spiral(r_vals, u_vals, radial_distance, output_path, backend=None, show=False):
+	'''
+	The following is not integral to the calculation
+	of the solar wind speed at the input radial distnace,
+	however, it provides an additional visualization via
+	The Parker Spiral. The Parker Spiral is discussed
+	in further detail in the README file, but in essence,
+	it depicts the dispersion of the Sun's Mangetic field
+	given its rotation speed and the velocity of the solar
+	wind (calculated in the above sections).
+
+	Parameters:
+		r_vals, u_vals: lists or numpy arrays, radial
+		distance values [km] and solar wind speed
+		values [km s^-1].
+
+		radial_distance: float, input radius [km]
+
+		output_path: str, location of the .png file.
+
+		backend: str, matplotlib backend, see load_pyplot.
+
+		show: bool, if True the figure is also shown
+		on screen, which waits for the window to close.
+	'''
+
+	plt = load_pyplot(backend)
+
+	#Setting two difference cases for plotting parameters, given input radius
+
+	if radial_distance < 150e6:
+		inner = np.searchsorted(r_vals, r_vals[0] + 148.5e6, side='right') #points within ~148 million km of our starting radius
+		r_vals_new = r_vals[0:inner] #setting a smaller r-value range to visualize the spiral easier
+		u_vals_new = u_vals[0:inner]
+
+		#Creating multiple spirals (incriments of pi/4) via Euler's Method, one row per field line
+		phi_lines = PSW.parker_spiral(solar_omega, r_vals_new, u_vals_new, n_lines=8)
+
+
+		#Setting phi and radius ranges to plot necessary circles
+		phi_circle = np.linspace(0, 2*np.pi, 50)
+		earth_rad_circ = np.full(50, PSW.planet_radii['Earth'])
+		venus_rad_circ = np.full(50, PSW.planet_radii['Venus'])
+		input_rad_circ = np.full(50, radial_distance)
+
+		#Plotting our spirals in a polar coordinate plot
+		fig, ax = plt.subplots(subplot_kw={'projection':'polar'})
+
+		#Plotting the B field lines, alternating colours
+		for i in range(len(phi_lines)):
+			if i % 2 == 0:
+				ax.plot(phi_lines[i], r_vals_new, color='darkgreen', label='Sun Magnetic Field' if i == 0 else None)
+			else:
+				ax.plot(phi_lines[i], r_vals_new, color='lightseagreen', alpha=0.5)
+
+		#Plotting problem specific locations/reference locations
+		ax.scatter(0, radial_distance, color='purple', marker='*', label=f'Input Radius, {round(radial_distance,3)} km', s=100)
+		ax.plot(phi_circle, earth_rad_circ, color='cyan', linestyle='dashed', label='Earth Radius')
+		ax.plot(phi_circle, input_rad_circ, color='indigo', linestyle='dashed')
+		ax.plot(phi_circle, venus_rad_circ, color='goldenrod', linestyle='dashed', label='Venus Radius')
+
+		#Setting plot lables/visuals
+		ax.legend(loc='lower left', bbox_to_anchor=(0.5 + np.cos(20)/2, 0.5 + np.sin(20)/2))
+		ax.set_xlabel('Solar Magnetic Field Angular Position')
+
+
+		plt.savefig(output_path)
+
+
+	else:
+
+		#Calculating our angular position valus for magnetic field via Euler's Method
+		#Creating multiple spirals (incriments of pi/4), one row per field line
+		phi_lines = PSW.parker_spiral(solar_omega, r_vals, u_vals, n_lines=8)
+
+
+		#Setting phi and radius ranges to plot necessary circles
+		phi_circle = np.linspace(0, 2*np.pi, 50)
+		earth_rad_circ = np.full(50, PSW.planet_radii['Earth'])
+		jup_rad_circ = np.full(50, PSW.planet_radii['Jupiter'])
+		input_rad_circ = np.full(50, radial_distance)
+
+		#Plotting our spirals in a polar coordinate plot
+		fig, ax = plt.subplots(subplot_kw={'projection':'polar'})
+
+		#Plotting the B field lines, alternating colours
+		for i in range(len(phi_lines)):
+			if i % 2 == 0:
+				ax.plot(phi_lines[i], r_vals, color='darkgreen', label='Sun Magnetic Field' if i == 0 else None)
+			else:
+				ax.plot(phi_lines[i], r_vals, color='lightseagreen', alpha=0.5)
+
+		#Plotting problem specific locations/reference locations
+		ax.scatter(0, radial_distance, color='purple', marker='*', label=f'Input Radius, {round(radial_distance,3)} km', s=100)
+		ax.plot(phi_circle, earth_rad_circ, color='cyan', linestyle='dashed', label='Earth Radius')
+		ax.plot(phi_circle, input_rad_circ, color='indigo', linestyle='dashed')
+		ax.plot(phi_circle, jup_rad_circ, color='darkorange', linestyle='dashed', label='Jupiter Radius')
+
+		#Setting plot lables/visuals
+		ax.legend(loc='lower left', bbox_to_anchor=(0.5 + np.cos(20)/2, 0.5 + np.sin(20)/2))
+		ax.set_xlabel('Solar Magnetic Field Angular Position')
+
+
+		plt.savefig(output_path)
+
+
+	if show:
+		plt.show()
+
+	plt.close(fig)
+
+
+
+# ----------------------
+# Command Line Interface
+# ----------------------
+
+def parse_args(argv=None):
+	'''
+	This function reads the program inputs from the
+	command line. Any input that isn't given falls
+	back to its value in the 'Input Parameters'
+	section above.
+
+	Parameters:
+		argv: list of str, command line arguments,
+		or None to read them from sys.argv.
+
+	Returns:
+		args: argparse.Namespace, the program inputs.
+	'''
+
+	parser = argparse.ArgumentParser(description='Solar wind speed at a distance from the Sun via the Parker Model of Solar Wind.')
+
+	parser.add_argument('-T', '--temperature', type=float, default=corona_temperature, help='coronal temperature [K], 0.5e6 to 4e6')
+	parser.add_argument('-r', '--radius', nargs='+', default=radial_distance, help="radial distance(s) [km], critical radius to 766.44e6, or body names e.g. 'Mars Jupiter'")
+	parser.add_argument('--solver', choices=['RK4', 'RK45', 'analytic'], default=solver, help='integration method')
+	parser.add_argument('--data-output', default=output_filepath_RK4, help='solar wind data text file')
+	parser.add_argument('--binary-output', default=output_filepath_binary, help='full precision binary .npy copy of the data')
+	parser.add_argument('--export-output', default=output_filepath_export, help='columnar copy of the data (.parquet or .arrow; .npz without pyarrow)')
+	parser.add_argument('--plot-output', default=output_filepath_PSW_graph, help='solar wind speed plot (.png)')
+	parser.add_argument('--spiral-output', default=output_filepath_p_spiral, help='Parker Spiral plot (.png)')
+	parser.add_argument('--stop-at-radius', action='store_true', help='stop integrating once past the (largest) input radius, instead of at the orbit of Jupiter')
+	parser.add_argument('--no-plot', action='store_true', help='skip both plots, and never import matplotlib')
+	parser.add_argument('--backend', default=None, help="matplotlib backend, e.g. 'Agg' for headless runs")
+	parser.add_argument('--show', action='store_true', help='also show the plots on screen (waits for the windows to close)')
+	parser.add_argument('--rk4-backend', choices=['auto', 'python', 'numba'], default=None, help="RK4 step loop (default python): 'numba' compiles it (needs Numba, ~0.6 s to load, pays off for very long runs), 'auto' uses numba if installed")
+	parser.add_argument('--profile', action='store_true', help='print the time spent in each stage and the df_dr call count at exit')
+	parser.add_argument('--profile-output', default=None, help='also save the --profile report to this JSON file')
+
+	return parser.parse_args(argv)
+
+
+
+def target_radii(targets):
+	'''
+	This function turns the requested radial
+	distances, given as numbers and/or names of
+	bodies in PSW.planet_radii, into radii.
+
+	Parameters:
+		targets: float, str, or list of either.
+
+	Returns:
+		labels: list of str, the body name of each
+		target, or None for plain distances.
+
+		radii: numpy array, radial distances [km]
+	'''
+
+	if isinstance(targets, (str, int, float)):
+		targets = [targets]
+
+	names = {name.lower(): name for name in PSW.planet_radii}
+	labels = []
+	radii = []
+
+	for target in targets:
+		if isinstance(target, str) and target.lower() in names:
+			labels.append(names[target.lower()])
+			radii.append(PSW.planet_radii[names[target.lower()]])
+			continue
+
+		try:
+			radii.append(float(target))
+		except ValueError:
+			raise Exception('Oops! ' + str(target) + ' is neither a distance nor one of ' + ', '.join(PSW.planet_radii) + '!')
+		labels.append(None)
+
+	radii = np.array(radii)
+
+	if np.any(radii > PSW.jupiter_radius):
+		raise Exception('Oops! Your input distance value is too large, and outside our model range!')
+
+	return labels, radii
+
+
+
+def main(argv=None):
+	'''
+	This function runs the whole program: solving
+	for the solar wind, saving the data, printing
+	the speed at every input radius and plotting
+	the results.
+
+	Parameters:
+		argv: list of str, command line arguments,
+		or None to read them from sys.argv.
+
+	Returns:
+		input_solar_wind_speed: float, solar wind
+		speed at the input radius [km s^-1], or a
+		numpy array with the speed at each of
+		several input radii.
+	'''
+
+	args = parse_args(argv)
+
+	if args.rk4_backend is not None:
+		PSW.rk4_backend = args.rk4_backend
+
+	if args.profile or args.profile_output is not None:
+		instrument.enable(args.profile_output, print_at_exit=args.profile)
+
+	labels, radii = target_radii(args.radius)
+
+	#One solve for every target, keeping the step past Jupiter so it can be a target too
+	r_vals, u_vals, steps = solve_solar_wind(args.temperature, args.solver, r_stop=radii.max() if args.stop_at_radius else PSW.jupiter_radius,
+		include_edge=True, return_steps=True)
+
+	#The data file & plots only cover the inside of the orbit of Jupiter, as before
+	inside = np.searchsorted(r_vals, PSW.jupiter_radius, side='left')
+	r_data, u_data = r_vals[:inside], u_vals[:inside]
+
+	#Saving data to data file, recording the number of steps actually taken
+	fixed_step = args.solver != 'RK45'
+	write_solution(r_data, u_data, args.temperature, args.solver, args.data_output, args.binary_output,
+		h if fixed_step else None, steps, args.export_output)
+
+	# -------------
+	# Interpolation
+	# -------------
+
+	'''
+	The following uses methods of linear interpolation
+	to find the solar wind speed at our input radial
+	distances.
+
+	The RK4 r-values straddling each input r-value
+	are found via a binary search, and the speed is
+	read off the line connecting them (see speed_at
+	in the PSW_function_library), for every input
+	r-value at once.
+	'''
+
+	#Finding our solar wind speeds!
+	with instrument.stage('interpolate'):
+		speeds = PSW.speed_at(radii, r_vals, u_vals)
+
+	#Printing out the final answers
+	for label, radius, speed in zip(labels, radii, speeds):
+		if label is None:
+			print('Solar Wind Speed at a distance of', radius, 'km from the Sun =', speed ,'km s^-1')
+		else:
+			print('Solar Wind Speed at ' + label + ', a distance of', radius, 'km from the Sun =', speed ,'km s^-1')
+
+	#The plots mark the first input radius
+	radial_distance = radii[0]
+	input_solar_wind_speed = speeds[0]
+
+	if not args.no_plot:
+		with instrument.stage('plot_solar_wind'):
+			plot_solar_wind(r_data, u_data, PSW.critical_radius(args.temperature), radial_distance, input_solar_wind_speed,
+				args.plot_output, args.backend, args.show)
+
+		with instrument.stage('plot_parker_spiral'):
+			plot_parker_spiral(r_data, u_data, radial_distance, args.spiral_output, args.backend, args.show)
+
+	return input_solar_wind_speed if len(speeds) == 1 else speeds
 
-'''
 
-#Setting constants
-solar_omega = 2.7e-6 #Solar angular velocity [rad s^-1]
-
-#Setting two difference cases for plotting parameters, given input radius
 
-if radial_distance < 150e6: 
-	r_vals_new = r_vals[0:149] #setting a smaller r-value range to visualize the spiral easier
-	u_vals_new = u_vals[0:149]
-	phi_vals = PSW.euler_method_parker(solar_omega, r_vals_new, u_vals_new)
-
-	#Creating multiple spirals (incriments of pi/4)
-	dPhi = np.pi/4
-
-	phi_one = phi_vals				#dPhi = 0
-	phi_two = phi_one + dPhi		#dPhi = pi/4
-	phi_three = phi_two + dPhi		#dPhi = pi/2
-	phi_four = phi_three + dPhi		#dPhi = 3*pi/4
-	phi_five = phi_four + dPhi		#dPhi = pi
-	phi_six = phi_five + dPhi		#dPhi = 5*pi/4
-	phi_seven = phi_six + dPhi		#dPhi = 3*pi/2
-	phi_eight = phi_seven + dPhi 	#dPhi = 7*pi/4
-
-
-	#Setting phi and radius ranges to plot necessary circles
-	phi_circle = np.linspace(0, 2*np.pi, 50)
-	earth_rad_circ = np.full(50, 149e6)
-	venus_rad_circ = np.full(50, 108.64e6 )
-	input_rad_circ = np.full(50, radial_distance)
-
-	#Plotting our spirals in a polar coordinate plot
-	fig, ax = plt.subplots(subplot_kw={'projection':'polar'})
-
-	#Plotting the B field lines 
-	ax.plot(phi_one, r_vals_new, color='darkgreen', label='Sun Magnetic Field')
-	ax.plot(phi_two, r_vals_new, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_three, r_vals_new, color='darkgreen')
-	ax.plot(phi_four, r_vals_new, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_five, r_vals_new, color='darkgreen')
-	ax.plot(phi_six, r_vals_new, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_seven, r_vals_new, color='darkgreen')
-	ax.plot(phi_eight, r_vals_new, color='lightseagreen', alpha=0.5)
-
-	#Plotting problem specific locations/reference locations
-	ax.scatter(0, radial_distance, color='purple', marker='*', label=f'Input Radius, {round(radial_distance,3)} km', s=100)
-	ax.plot(phi_circle, earth_rad_circ, color='cyan', linestyle='dashed', label='Earth Radius')
-	ax.plot(phi_circle, input_rad_circ, color='indigo', linestyle='dashed')
-	ax.plot(phi_circle, venus_rad_circ, color='goldenrod', linestyle='dashed', label='Venus Radius')
-
-	#Setting plot lables/visuals
-	ax.legend(loc='lower left', bbox_to_anchor=(0.5 + np.cos(20)/2, 0.5 + np.sin(20)/2))	
-	ax.set_xlabel('Solar Magnetic Field Angular Position')
-
-
-	plt.savefig(output_filepath_p_spiral)
-	plt.show()
-
-
-else: 
-
-	#Calculating our angular position valus for magnetic field via Euler's Method
-	phi_vals = PSW.euler_method_parker(solar_omega, r_vals, u_vals)
-
-	#Creating multiple spirals (incriments of pi/4)
-	dPhi = np.pi/4
-
-	phi_one = phi_vals				#dPhi = 0
-	phi_two = phi_one + dPhi		#dPhi = pi/4
-	phi_three = phi_two + dPhi		#dPhi = pi/2
-	phi_four = phi_three + dPhi		#dPhi = 3*pi/4
-	phi_five = phi_four + dPhi		#dPhi = pi
-	phi_six = phi_five + dPhi		#dPhi = 5*pi/4
-	phi_seven = phi_six + dPhi		#dPhi = 3*pi/2
-	phi_eight = phi_seven + dPhi 	#dPhi = 7*pi/4
-
-
-	#Setting phi and radius ranges to plot necessary circles
-	phi_circle = np.linspace(0, 2*np.pi, 50)
-	earth_rad_circ = np.full(50, 149e6)
-	jup_rad_circ = np.full(50, 766.44e6 )
-	input_rad_circ = np.full(50, radial_distance)
-
-	#Plotting our spirals in a polar coordinate plot
-	fig, ax = plt.subplots(subplot_kw={'projection':'polar'})
-
-	#Plotting the B field lines 
-	ax.plot(phi_one, r_vals, color='darkgreen', label='Sun Magnetic Field')
-	ax.plot(phi_two, r_vals, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_three, r_vals, color='darkgreen')
-	ax.plot(phi_four, r_vals, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_five, r_vals, color='darkgreen')
-	ax.plot(phi_six, r_vals, color='lightseagreen', alpha=0.5)
-	ax.plot(phi_seven, r_vals, color='darkgreen')
-	ax.plot(phi_eight, r_vals, color='lightseagreen', alpha=0.5)
-
-	#Plotting problem specific locations/reference locations
-	ax.scatter(0, radial_distance, color='purple', marker='*', label=f'Input Radius, {round(radial_distance,3)} km', s=100)
-	ax.plot(phi_circle, earth_rad_circ, color='cyan', linestyle='dashed', label='Earth Radius')
-	ax.plot(phi_circle, input_rad_circ, color='indigo', linestyle='dashed')
-	ax.plot(phi_circle, jup_rad_circ, color='darkorange', linestyle='dashed', label='Jupiter Radius')
-
-	#Setting plot lables/visuals
-	ax.legend(loc='lower left', bbox_to_anchor=(0.5 + np.cos(20)/2, 0.5 + np.sin(20)/2))	
-	ax.set_xlabel('Solar Magnetic Field Angular Position')
-
-
-	plt.savefig(output_filepath_p_spiral)
-	#plt.show()
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,227 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import numpy as np
+import json
+import os
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Columnar Export>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following exports solar wind trajectories, and the
+results of parameter sweeps (see PSW_sweep), as columnar
+files for dataframe engines: Parquet (.parquet) or Arrow
+IPC (.arrow, also known as Feather), at full float64
+precision.
+
+Column names carry their units, e.g. 'r_km' and 'u_km_s',
+and the temperature, solver, step size and units are
+kept in the file's metadata.
+
+When pyarrow is not installed, the same columns and
+metadata are written to a numpy .npz file instead (the
+metadata as a JSON string under '_metadata'), and
+read_table reads any of the three back.
+'''
+
+#Column names & units of the exported tables
+trajectory_units = {'r_km': 'km', 'u_km_s': 'km s^-1'}
+sweep_units = {'temperature_K': 'K', 'radius_km': 'km', 'speed_km_s': 'km s^-1'}
+
+#pyarrow's modules once imported, False if it is not installed, None before the first export
+_arrow = None
+
+
+
+def _pyarrow():
+	'''
+	This function imports pyarrow the first time
+	an export or read needs it, so that importing
+	this module (e.g. via the PSW_executable) costs
+	nothing when no columnar file is written.
+
+	Returns:
+		pa, pq, feather: the pyarrow, pyarrow.parquet
+		and pyarrow.feather modules, or None if
+		pyarrow is not installed.
+	'''
+
+	global _arrow
+
+	if _arrow is None:
+		try:
+			import pyarrow
+			import pyarrow.parquet
+			import pyarrow.feather
+			_arrow = (pyarrow, pyarrow.parquet, pyarrow.feather)
+		except ImportError:
+			_arrow = False
+
+	return _arrow or None
+
+
+
+def _write_table(path, columns, metadata, compression='zstd'):
+	'''
+	This function writes named columns and their
+	metadata in the format given by the extension
+	of path: .parquet, or .arrow/.feather. Without
+	pyarrow, or for a .npz path, a .npz file is
+	written next to path instead.
+
+	Returns:
+		path: str, location of the written file.
+	'''
+
+	stem, extension = os.path.splitext(path)
+
+	#Checked first, so a bad path fails the same way with or without pyarrow
+	if extension not in ('.parquet', '.arrow', '.feather', '.npz'):
+		raise Exception('Oops! Your export file must end in .parquet, .arrow, .feather or .npz!')
+
+	arrow = None if extension == '.npz' else _pyarrow()
+
+	if arrow is None:
+		path = stem + '.npz'
+		np.savez(path, _metadata=np.array(json.dumps(metadata)), **columns)
+		return path
+
+	pa, pq, feather = arrow
+
+	table = pa.table(columns).replace_schema_metadata({'PSW': json.dumps(metadata)})
+
+	if extension == '.parquet':
+		pq.write_table(table, path, compression=compression)
+	else:
+		feather.write_feather(table, path, compression=compression)
+
+	return path
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def export_trajectory(path, r_vals, u_vals, T, solver='RK4', h=None, N=None, compression='zstd'):
+	'''
+	This function exports one solar wind solution
+	as a two column table, 'r_km' and 'u_km_s'.
+
+	Parameters:
+		path: str, location of the file, ending in
+		.parquet, .arrow, .feather or .npz.
+
+		r_vals: numpy array, radial distance values [km]
+
+		u_vals: numpy array, solar wind speed values [km s^-1]
+
+		T: float, coronal temperature in Kelvin.
+
+		solver: str, name of the solver used.
+
+		h: float, step size of the integration [km]
+
+		N: int, number of steps of the integration
+
+		compression: str, codec of the Parquet/Arrow
+		file, e.g. 'zstd', 'lz4' or 'uncompressed'.
+
+	Returns:
+		path: str, location of the written file, which
+		ends in .npz if pyarrow is not installed.
+	'''
+
+	columns = {'r_km': np.asarray(r_vals, dtype=np.float64), 'u_km_s': np.asarray(u_vals, dtype=np.float64)}
+
+	metadata = {'kind': 'trajectory', 'temperature': float(T), 'solver': solver,
+		'h': None if h is None else float(h), 'N': None if N is None else int(N),
+		'length': len(columns['r_km']), 'units': trajectory_units}
+
+	return _write_table(path, columns, metadata, compression)
+
+
+
+def export_sweep(path, results, solver='RK4', h=None, N=None, compression='zstd'):
+	'''
+	This function exports the results of a
+	parameter sweep as a three column table,
+	'temperature_K', 'radius_km' and 'speed_km_s'.
+
+	Parameters:
+		path: str, location of the file, ending in
+		.parquet, .arrow, .feather or .npz.
+
+		results: numpy structured array, from
+		PSW_sweep.sweep.
+
+		solver, h, N, compression: as in
+		export_trajectory.
+
+	Returns:
+		path: str, location of the written file, which
+		ends in .npz if pyarrow is not installed.
+	'''
+
+	columns = {'temperature_K': np.ascontiguousarray(results['temperature']),
+		'radius_km': np.ascontiguousarray(results['radius']),
+		'speed_km_s': np.ascontiguousarray(results['speed'])}
+
+	metadata = {'kind': 'sweep', 'solver': solver, 'h': None if h is None else float(h),
+		'N': None if N is None else int(N), 'length': len(results), 'units': sweep_units}
+
+	return _write_table(path, columns, metadata, compression)
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def read_table(path):
+	'''
+	This function reads a file written by
+	export_trajectory or export_sweep.
+
+	Parameters:
+		path: str, location of the .parquet, .arrow,
+		.feather or .npz file.
+
+	Returns:
+		columns: dict, numpy array of each column.
+
+		metadata: dict, the temperature, solver, step
+		size and units stored with the table.
+	'''
+
+	extension = os.path.splitext(path)[1]
+
+	if extension == '.npz':
+		with np.load(path) as data:
+			metadata = json.loads(str(data['_metadata']))
+			columns = {name: data[name] for name in data.files if name != '_metadata'}
+		return columns, metadata
+
+	arrow = _pyarrow()
+
+	if arrow is None:
+		raise Exception('Oops! Reading ' + extension + ' files needs pyarrow, which is not installed!')
+
+	pa, pq, feather = arrow
+
+	if extension == '.parquet':
+		table = pq.read_table(path)
+	else:
+		table = feather.read_table(path)
+
+	metadata = json.loads(table.schema.metadata[b'PSW'])
+	columns = {name: table.column(name).to_numpy() for name in table.column_names}
+
+	return columns, metadata
@@ -1,8 +1,8 @@
 #!usr/local/Anaconda2023/bin/python3.11
 
 import numpy as np 
-import matplotlib.pyplot as plt
 from math import *
+import importlib.util
 
 
 ################################################################
@@ -21,6 +21,65 @@ proton_mass     = 1.67e-27		#kilograms
 solar_radius    = 6.96e5		#kilometers
 T_0             = 5.8e6			#Kelvin
 
+#Limits & landmarks of the model, shared by every program file
+T_min           = 0.5e6			#Kelvin, coolest coronal temperature
+T_max           = 4e6			#Kelvin, hottest coronal temperature
+jupiter_radius  = 766.44e6		#kilometers, outer edge of the model
+planet_radii    = {'Venus': 108.64e6, 'Earth': 149e6, 'Mars': 228e6, 'Jupiter': jupiter_radius}	#kilometers
+
+#RK4 backend used when none is given: 'python', 'numba', or 'auto' (numba if installed).
+#Importing Numba & loading the kernel costs ~0.6 s per process, far more than a ~770 step solve takes
+rk4_backend     = 'python'
+
+
+
+def _check_temperature(T):
+	'''
+	This function imposes the coronal temperature 
+	constraints shared by the critical radius and 
+	coronal sound speed equations, element-wise 
+	for numpy arrays. 
+
+	Every out of range temperature is gathered 
+	into a single error message, rather than 
+	stopping at the first bad value. 
+
+	Parameters: 
+		T: float or numpy array, temperature of the 
+		Solar Corona in Kelvin. 
+
+	Returns: 
+		T: float or numpy array, the validated 
+		temperature(s). 
+	'''
+
+	T_array = np.asarray(T, dtype=float)
+
+	too_low = T_array < T_min	#violating the lower temperature limit
+	too_high = T_array > T_max	#violating the upper temperature limit
+
+	if T_array.ndim == 0:
+		#Keeping the original messages for a single temperature
+		if too_low:
+			raise Exception('Oops! Your temperature value is too low to have real world implications!')
+		if too_high:
+			raise Exception('Oops! Your temperature value is too high to have real world implications!')
+		return float(T_array)
+
+	if too_low.any() or too_high.any():
+		message = 'Oops! Some of your temperature values are outside the 0.5e6 K to 4e6 K range:'
+		if too_low.any():
+			message += f' {int(too_low.sum())} too low {T_array[too_low].tolist()}'
+		if too_high.any():
+			message += f' {int(too_high.sum())} too high {T_array[too_high].tolist()}'
+		raise Exception(message)
+
+	return T_array
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
 
 
 def critical_radius(T):
@@ -32,27 +91,19 @@ def critical_radius(T):
 	transitions from subsonic to supersonic speed.
 
 	Parameters: 
-		T: float, temperature of the Solar Corona in Kelvin. 
-		This value is constrained between 0.5 million K and 
-		4 million K. 
+		T: float or numpy array, temperature of the Solar 
+		Corona in Kelvin. This value is constrained between 
+		0.5 million K and 4 million K. 
 
 	Returns: 
-		r_c: float, the critical radius in kilometers. 
+		r_c: float or numpy array, the critical radius in 
+		kilometers. 
 	'''
 
 	#Imposing our temperature constraints
-	if T < 0.5e6:
-		#Error message violating the lower temperature limit
-		raise Exception('Oops! Your temperature value is too low to have real world implications!')
-
+	T = _check_temperature(T)
 
-	elif T > 4e6:
-		#Error message for violating the upper temperature limit
-		raise Exception('Oops! Your temperature value is too high to have real world implications!')
-
-
-	else: 
-		r_c = (T_0/T) * solar_radius
+	r_c = (T_0/T) * solar_radius
 
 	return r_c
 
@@ -74,28 +125,19 @@ def coronal_sound_speed(T):
 	Maxwell Speed Distribution.
 
 	Parameters: 
-		T: float, temperature of the Sun's corona in Kelvin.
-		This value is constranted between 0.5 million K and 
-		4 million K. 
+		T: float or numpy array, temperature of the Sun's 
+		corona in Kelvin. This value is constranted between 
+		0.5 million K and 4 million K. 
 
 	Returns: 
-		u_c^2: float, the coronal sound speed, specifically a
-		velocity squared, in km^2 s^-2. 
+		u_c^2: float or numpy array, the coronal sound speed, 
+		specifically a velocity squared, in km^2 s^-2. 
 	'''
 
 	#Imposing our temperature constraints
-	if T < 0.5e6:
-		#Error message violating the lower temperature limit
-		raise Exception('Oops! Your temperature value is too low to have real world implications!')
+	T = _check_temperature(T)
 
-
-	elif T > 4e6:
-		#Error message for violating the upper temperature limit
-		raise Exception('Oops! Your temperature value is too high to have real world implications!')
-
-
-	else:
-		u_c_squared = (2*boltzmann_k*T)/proton_mass
+	u_c_squared = (2*boltzmann_k*T)/proton_mass
 
 	return u_c_squared
 
@@ -119,33 +161,38 @@ def df_dr(r,f,u_c_squared, r_c):
 	result will be used as our Runge Kutta 4
 	function to be integrated. 
 
+	All parameters may also be numpy arrays (of 
+	broadcastable shapes), in which case the 
+	derivative is evaluated element-wise. 
+
 	Parameters: 
-		r: float, the radius from the Sun in 
-		meters. This is the location where you 
-		want to know the solar wind speed u. 
+		r: float or numpy array, the radius from 
+		the Sun in meters. This is the location 
+		where you want to know the solar wind speed u. 
 
-		f: float, a given solar wind speed value
-		in km^2 s^-2. 
+		f: float or numpy array, a given solar wind 
+		speed value in km^2 s^-2. 
 
-		u_c_squared: float, the coronal sound speed 
-		in km^2 s^-2 .
+		u_c_squared: float or numpy array, the coronal 
+		sound speed in km^2 s^-2 .
 
-		r_c: float, critical radius in km. 
+		r_c: float or numpy array, critical radius in km. 
 
 
 	Returns: 
-		df/dr: float, the derivative of solar wind 
-		speed u^2 with respect to distance r. 
+		df/dr: float or numpy array, the derivative of 
+		solar wind speed u^2 with respect to distance r. 
 	'''
 
 
 	numerator = ((4 * u_c_squared)/r) * (1 - (r_c/r))
 
 	#Won't divide by zero if speed are equal 
-	if u_c_squared == f: 
-		denominator = 1e-8
+	if isinstance(f, float) and isinstance(u_c_squared, float):
+		#Plain scalar branch, cheaper than a mask for single values
+		denominator = 1e-8 if u_c_squared == f else (1 - (u_c_squared/f))
 	else: 
-		denominator = (1 - (u_c_squared/f))
+		denominator = np.where(u_c_squared == f, 1e-8, 1 - (u_c_squared/f))
 
 	return numerator/denominator 
 
@@ -155,86 +202,208 @@ def df_dr(r,f,u_c_squared, r_c):
 
 
 
+def bracketing_indices(r_values, my_rval):
+	'''
+	This function finds the indices of the two 
+	r-points, from our set of RK4 r values, that 
+	straddle our input r value(s). 
+
+	Since the r values are sorted, this is done 
+	via a binary search (np.searchsorted), which 
+	takes O(log n) time per query and works for 
+	equal or unequal step sizes alike. 
+
+	Parameters: 
+		r_values: numpy array, sorted set of r 
+		values, in km, generated from our 
+		integration. 
+
+		my_rval: float or numpy array, input 
+		distance(s) r at which we want to find 
+		the solar wind speed. 
+
+	Returns: 
+		left_index, right_index: ints or numpy 
+		arrays, indices of the points straddling 
+		my_rval, with right_index = left_index + 1. 
+	'''
+
+	r_values = np.asarray(r_values, dtype=float)
+	my_rval = np.asarray(my_rval, dtype=float)
+
+	#Accounting for our limiting cases...
+	too_small = my_rval < r_values[0]
+	too_large = my_rval > r_values[-1]
+
+	if too_small.any():
+		raise Exception('Oops! Your input distance value is too small, and outside our model range!')
+
+	elif too_large.any():
+		raise Exception('Oops! Your input distance value is too large, and outside our model range!')
+
+	#Last r value at or below our input, kept off the final point so a right neighbour exists
+	left_index = np.searchsorted(r_values, my_rval, side='right') - 1
+	left_index = np.clip(left_index, 0, len(r_values) - 2)
+
+	return left_index[()], (left_index + 1)[()]
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
 def closest_points(r_values, my_rval):
 	'''
 	This function calculates the two r-points, 
 	from out set of RK4 r values, that are 
 	'straddle' our input r value. 
 
-	This is done so by utilzing our equal
-	r-step divides to find the point to
-	the left and right of our input 
-	distance. See the README for a visual
-	explanation of the logic.
+	The points are located via the binary search 
+	in bracketing_indices. See the README for a 
+	visual explanation of the logic.
 
 	Parameters: 
 		r_values: numpy array, set of r
 		valules, in km, generated from our 
 		Runge Kutta 4 integration. 
 
-		my_rval: float, input distance
-		r at which we want to find the
+		my_rval: float or numpy array, input 
+		distance r at which we want to find the
 		solar wind speed. 
 
 
 	Returns: 
-		left_point, right point: floats, the 
-		values of the points straddling
+		left_point, right point: floats or numpy 
+		arrays, the values of the points straddling
 		my_rval. 
 	'''
 
+	r_values = np.asarray(r_values, dtype=float)
 
-	#Initializing values & empty array
-	difference = []
-	right_point = 0
-	left_point = 0
+	left_index, right_index = bracketing_indices(r_values, my_rval)
 
-	'''Iterate through r-values to find one closest to given input 
-	r-value.'''
-	for i in range(len(r_values)):
-		difference.append(abs(r_values[i]-my_rval)) #distance between our input r_value and RK4 list of r values
+	left_point = r_values[left_index]
+	right_point = r_values[right_index]
 
-	closest_point_value = r_values[int(np.argwhere(difference == min(difference)))] #value of closest r point
-	closest_point_index = int(np.argwhere(r_values == closest_point_value)) #index of closest r point
+	return left_point, right_point
 
 
-	'''Using our equal r-value spacing and indexing to find the
-	surrounding r-value points.'''
-	closest_right_distance = abs(r_values[closest_point_index+1]-my_rval) #distance b/w our r_val and the point right of the closest point
-	closest_left_distance = abs(r_values[closest_point_index-1]-my_rval)  #distance b/w our r_val and the point left of the closest point
 
+#----------------------------------------------------------------------------------------------------------------------------------------------
 
-	#Accounting for our limiting cases...
-	if my_rval < r_values[0]:
-		raise Exception('Oops! Your input distance value is too small, and outside our model range!')
 
-	elif my_rval > r_values[-1]:
 
-		raise Exception('Oops! Your input distance value is too large, and outside our model range!')
+def _pchip_slopes(x, y):
+	'''
+	This function calculates the derivative at each 
+	point for monotone piecewise cubic Hermite 
+	interpolation (Fritsch-Carlson), which never 
+	overshoots the data between grid points. 
 
-	elif closest_point_index == 0:
-		#When our closest RK4 r value point doesn't have a point to its left
-		left_point = r_values[0]
-		right_point = r_values[1]
+	Parameters: 
+		x, y: numpy arrays, sorted grid values and 
+		the corresponding function values. 
 
-	elif closest_point_index == len(r_values) -1: 
-		#When our closest RK4 r value point doesn't have a point to its right
-		left_point = r_values[-2]
-		right_point = r_values[-1]
+	Returns: 
+		d: numpy array, derivative dy/dx at each x. 
+	'''
 
-	#Accounting for general cases...
-	elif closest_left_distance < closest_right_distance:
-		#Point right of closest RK4 r value is not straddling
-		right_point = float(closest_point_value)
-		left_point = float(r_values[closest_point_index-1])
+	h = np.diff(x)
+	delta = np.diff(y)/h
 
+	d = np.zeros_like(y)
 
-	elif closest_left_distance > closest_right_distance:
-		#Point left of closest RK4 r value is not straddling
-		left_point = float(closest_point_value)
-		right_point = float(r_values[closest_point_index+1])
+	if len(x) == 2:
+		d[:] = delta[0]
+		return d
 
-	return left_point, right_point
+	#Interior points, weighted harmonic mean of the neighbouring secant slopes
+	w1 = 2*h[1:] + h[:-1]
+	w2 = h[1:] + 2*h[:-1]
+	same_sign = (delta[:-1]*delta[1:]) > 0
+	with np.errstate(divide='ignore', invalid='ignore'):
+		harmonic = (w1 + w2)/(w1/delta[:-1] + w2/delta[1:])
+	d[1:-1] = np.where(same_sign, harmonic, 0)
+
+	#End points, shape preserving three point formula
+	for end, h0, h1, delta0, delta1 in ((0, h[0], h[1], delta[0], delta[1]), (-1, h[-1], h[-2], delta[-1], delta[-2])):
+		d_end = ((2*h0 + h1)*delta0 - h0*delta1)/(h0 + h1)
+		if np.sign(d_end) != np.sign(delta0):
+			d_end = 0
+		elif np.sign(delta0) != np.sign(delta1) and abs(d_end) > abs(3*delta0):
+			d_end = 3*delta0
+		d[end] = d_end
+
+	return d
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def speed_at(radii, r_values, u_values, method='linear'):
+	'''
+	This function finds the solar wind speed at 
+	any number of input radii in a single call, 
+	interpolating between our integrated r and u 
+	values. 
+
+	The straddling points for every radius are 
+	found at once via bracketing_indices, and 
+	the interpolation is done with array 
+	operations rather than one radius at a time. 
+
+	Parameters: 
+		radii: float or numpy array, input r-value(s) 
+		at which we want the solar wind speed [km]. 
+
+		r_values: numpy array, sorted set of r-values 
+		from our integration [km]. 
+
+		u_values: numpy array, set of u-values from 
+		our integration [km s^-1]. 
+
+		method: str, 'linear' for straight lines 
+		between grid points (as in linear_properties 
+		& y_from_line), or 'pchip' for monotone cubic 
+		Hermite interpolation, which stays accurate 
+		on a much coarser grid. 
+
+	Returns: 
+		u: float or numpy array, solar wind speed at 
+		each input radius [km s^-1]. 
+	'''
+
+	r_values = np.asarray(r_values, dtype=float)
+	u_values = np.asarray(u_values, dtype=float)
+
+	left, right = bracketing_indices(r_values, radii)
+	radii = np.asarray(radii, dtype=float)
+
+	x1, x2 = r_values[left], r_values[right]
+	y1, y2 = u_values[left], u_values[right]
+
+	if method == 'linear':
+		slope, intercept = linear_properties(x1, x2, y1, y2)
+		return y_from_line(radii, slope, intercept)
+
+	elif method == 'pchip':
+		d = _pchip_slopes(r_values, u_values)
+		h = x2 - x1
+		t = (radii - x1)/h
+
+		#Cubic Hermite basis functions
+		h00 = (1 + 2*t)*(1 - t)**2
+		h10 = t*(1 - t)**2
+		h01 = t**2*(3 - 2*t)
+		h11 = t**2*(t - 1)
+
+		return h00*y1 + h10*h*d[left] + h01*y2 + h11*h*d[right]
+
+	else:
+		raise Exception('Oops! Your interpolation method is not one of our available options!')
 
 
 
@@ -360,29 +529,737 @@ def euler_method_parker(solar_omega, r_values, u_values):
 		u_values: numpy array, solar wind velocity values
 		from RK4 integration [km s^-1].
 
+	The step size dR is taken from the actual spacing 
+	of r_values, so unequal (adaptive) steps are fine. 
+
 	Returns: 
 		phi_values: numpy array, phi values for our Parker Spiral.
 	'''
 
-	#Initializing array
-	phi0 = 0
-	phi = [phi0]
+	r_values = np.asarray(r_values, dtype=float)
+	u_values = np.asarray(u_values, dtype=float)
 
-	#Looping through RK4 generated r-values...
-	for i in range(len(r_values)-1):
-		dR = 1e6	#our h value from the RK4 integration 
-		dphi = -solar_omega * dR / u_values[i] #from dPhi_dR equation
-		phi.append(phi[-1] + dphi) #angle at next dPhi step
+	#Our step sizes, which may vary for adaptive integration
+	dR = np.diff(r_values)
+	dphi = -solar_omega * dR / u_values[:-1] #from dPhi_dR equation
 
-	
-	return np.array(phi)
+	#Angle at every step is the running sum of dPhi, starting at phi0 = 0
+	phi = np.empty(len(r_values))
+	phi[0] = 0
+	np.cumsum(dphi, out=phi[1:])
+
+	return phi
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+def parker_spiral(solar_omega, r_values, u_values, n_lines=8, method='euler'):
+	'''
+	This function calculates the angle phi of several 
+	Parker Spiral magnetic field lines at once, evenly 
+	spaced around the Sun (dPhi = pi/4 for the default 
+	eight lines). 
+
+	Equation 4 in the README file is integrated over 
+	the actual r spacing, either via Euler's Method as 
+	in euler_method_parker, or the trapezoid rule. 
+
+	Parameters: 
+		solar_omega: float, angular velocity of the sun [rad/s]
+
+		r_values: numpy array, r-values of distances from the 
+		Sun via the integration [km].
+
+		u_values: numpy array, solar wind velocity values
+		from the integration [km s^-1].
+
+		n_lines: int, number of field lines. 
+
+		method: str, 'euler' or 'trapezoid'. 
+
+	Returns: 
+		phi_lines: numpy array of shape (n_lines, len(r_values)), 
+		phi values of each field line, offset from the 
+		previous line by 2*pi/n_lines. 
+	'''
+
+	if method == 'euler':
+		phi = euler_method_parker(solar_omega, r_values, u_values)
+
+	elif method == 'trapezoid':
+		r_values = np.asarray(r_values, dtype=float)
+		dphi_dr_values = dphi_dr(solar_omega, np.asarray(u_values, dtype=float))
+
+		phi = np.empty(len(r_values))
+		phi[0] = 0
+		np.cumsum(0.5 * np.diff(r_values) * (dphi_dr_values[1:] + dphi_dr_values[:-1]), out=phi[1:])
+
+	else:
+		raise Exception('Oops! Your spiral integration method is not one of our available options!')
+
+	#Every field line is the first one rotated by a multiple of dPhi
+	dPhi = 2*np.pi / n_lines
+
+	return phi[None, :] + dPhi*np.arange(n_lines)[:, None]
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def steps_to_radius(r0, r_end, h):
+	'''
+	This function finds the number of fixed size 
+	steps needed to integrate from r0 until just 
+	past r_end, rather than using a hardcoded N. 
+
+	Parameters: 
+		r0: float, initial radial distance [km]
+
+		r_end: float, radial distance to reach [km]
+
+		h: float, step size [km]
+
+	Returns: 
+		N: int, number of steps, at least 1. 
+	'''
+
+	return max(1, ceil((r_end - r0)/h))
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def _df_dr_scalar(r, f, u_c_squared, r_c):
+	'''
+	This function is df_dr for plain floats only, 
+	written without numpy so that Numba can 
+	compile it. 
+	'''
+
+	numerator = ((4 * u_c_squared)/r) * (1 - (r_c/r))
+	denominator = 1e-8 if u_c_squared == f else (1 - (u_c_squared/f))
+
+	return numerator/denominator
+
+
+
+def _rk4_kernel(r_vals, f_vals, h, N, u_c_squared, r_c):
+	'''
+	This function is the RK4 step loop of 
+	RK4_solar_wind, filling the preallocated 
+	r_vals and f_vals (whose first values hold 
+	the initial conditions) in place. It is 
+	compiled by Numba when the 'numba' backend 
+	is first used (see _resolve_backend). 
+	'''
+
+	r = r_vals[0]
+	f = f_vals[0]
+
+	for i in range(N): 
+		k1 = h * _df_dr_scalar(r,f, u_c_squared, r_c)
+		k2 = h * _df_dr_scalar(r+0.5*h, f+0.5*k1, u_c_squared, r_c)
+		k3 = h * _df_dr_scalar(r+0.5*h, f+0.5*k2, u_c_squared, r_c)
+		k4 = h * _df_dr_scalar(r+ h, f+ k3, u_c_squared, r_c)
+
+		f += (k1 + 2*k2 + 2*k3 + k4) /6
+		r += h 
+
+		r_vals[i+1] = r
+		f_vals[i+1] = f
+
+
+
+def _rk4_steps(r_vals, f_vals, h, N, u_c_squared, r_c):
+	'''
+	This function is the interpreted twin of 
+	_rk4_kernel, taking N RK4 steps from the 
+	first values of r_vals and f_vals and filling 
+	in the rest in place. It calls df_dr by name, 
+	so PSW_instrumentation can count the calls. 
+	'''
+
+	r = float(r_vals[0])
+	f = float(f_vals[0])
+
+	for i in range(N): 
+		k1 = h * df_dr(r,f, u_c_squared, r_c)
+		k2 = h * df_dr(r+0.5*h, f+0.5*k1, u_c_squared, r_c)
+		k3 = h * df_dr(r+0.5*h, f+0.5*k2, u_c_squared, r_c)
+		k4 = h * df_dr(r+ h, f+ k3, u_c_squared, r_c)
+
+		f += (k1 + 2*k2 + 2*k3 + k4) /6
+		r += h 
+
+		r_vals[i+1] = r
+		f_vals[i+1] = f
+
+
+
+def _rk4_filler(backend):
+	'''
+	This function gives the step loop of the 
+	chosen RK4 backend: _rk4_steps, or the 
+	compiled _rk4_kernel. Both take the arguments 
+	(r_vals, f_vals, h, N, u_c_squared, r_c). 
+	'''
+
+	return _compiled_rk4_kernel if _resolve_backend(backend) == 'numba' else _rk4_steps
+
+
+
+#Numba is optional and slow to import, so it is only found here, and imported once the 'numba' backend is used
+_numba_installed = importlib.util.find_spec('numba') is not None
+_compiled_rk4_kernel = None
+
+
+
+def available_backends():
+	'''
+	This function lists the RK4 backends that can 
+	be used in this environment. 
+
+	Returns: 
+		backends: list of str, 'python', plus 
+		'numba' if Numba is installed. 
+	'''
+
+	return ['python', 'numba'] if _numba_installed else ['python']
+
+
+
+def _resolve_backend(backend):
+	'''
+	This function turns a requested RK4 backend 
+	(or None, for the module wide rk4_backend) 
+	into the one that will actually run. The 
+	first time that is 'numba', Numba is imported 
+	and the step loop compiled (or loaded from 
+	Numba's on disk cache). 
+	'''
+
+	global _df_dr_scalar, _compiled_rk4_kernel
+
+	if backend is None:
+		backend = rk4_backend
+
+	if backend == 'auto':
+		backend = 'numba' if _numba_installed else 'python'
+
+	if backend == 'numba' and not _numba_installed:
+		raise Exception('Oops! The numba RK4 backend needs Numba, which is not installed!')
+
+	if backend not in ('python', 'numba'):
+		raise Exception('Oops! Your RK4 backend is not one of our available options!')
+
+	if backend == 'numba' and _compiled_rk4_kernel is None:
+		import numba
+
+		#fastmath stays off, so the compiled loop does the same float operations in the same order
+		_df_dr_scalar = numba.njit(cache=True)(_df_dr_scalar)	#rebound first, so the kernel compiles against it
+		_compiled_rk4_kernel = numba.njit(cache=True)(_rk4_kernel)
+
+	return backend
 
 
 
 #----------------------------------------------------------------------------------------------------------------------------------------------
 
 
-print('ParkerSolarWind Function Library Updated.')
+
+def RK4_solar_wind(r0, f0, h, N, u_c_squared, r_c, r_stop=None, backend=None):
+	'''
+	This function utilzies the RK4 method 
+	of integration to find the dependence 
+	of solar wind speed on distance from 
+	the Sun. 
+
+	Here, our function to integrate is 
+	df_dr. The results are written straight 
+	into arrays of N+1 values allocated up 
+	front, rather than grown one step at a 
+	time. 
+
+	Parameters: 
+		r0: float, initial radial distance [km]
+
+		f0: float, initial solar wind speed 
+		squared [km^2 s^-2]
+
+		h: float, step size
+
+		N = int, number of steps, or None to take 
+		just enough steps to pass r_stop. 
+
+		u_c_squared: float, the coronal sound speed 
+		in km^2 s^-2.
+
+		r_c: float, critical radius in km. 
+
+		r_stop: float, radial distance [km] at which 
+		to stop early, once it has been reached or 
+		passed (e.g. the radius being queried). None 
+		integrates all N steps. 
+
+		backend: str, 'python' calls df_dr from the 
+		interpreter every stage, 'numba' runs the 
+		whole step loop compiled, and 'auto' picks 
+		numba when it is installed. None uses the 
+		module wide rk4_backend ('python' unless 
+		changed). The numba loop does 
+		not call df_dr itself, so it is not seen by 
+		PSW_instrumentation's df_dr counts. 
+
+	Returns: 
+		r_vals, f_vals: numpy arrays, radial distance 
+		values and solar wind speed values squared 
+		[km] and [km^2 s^-2].
+	'''
+
+	if r_stop is not None:
+		#No more steps than it takes to pass r_stop
+		needed = steps_to_radius(r0, r_stop, h)
+		N = needed if N is None else min(N, needed)
+
+	elif N is None:
+		raise Exception('Oops! Either a number of steps N or a stopping radius r_stop is needed!')
+
+	r_vals = np.empty(N+1)
+	f_vals = np.empty(N+1)
+
+	r_vals[0] = float(r0)
+	f_vals[0] = float(f0)
+
+	_rk4_filler(backend)(r_vals, f_vals, float(h), N, float(u_c_squared), float(r_c))
+
+	return r_vals, f_vals
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def RK4_solar_wind_chunks(r0, f0, h, N, u_c_squared, r_c, chunk_size=100000, r_stop=None, backend=None):
+	'''
+	This function performs the same integration as 
+	RK4_solar_wind, but hands the trajectory back 
+	piece by piece as a generator, so that only one 
+	chunk is ever held in memory no matter how 
+	large N is. Each chunk can be written out (see 
+	the streaming writers in PSW_store) or used as 
+	soon as it is produced. 
+
+	Each chunk is filled by the same step loop as 
+	RK4_solar_wind (of the chosen backend), starting 
+	from the last point of the chunk before, so the 
+	chunks join up into exactly the same trajectory. 
+
+	Parameters: 
+		r0, f0, h, N, u_c_squared, r_c, r_stop, 
+		backend: as in RK4_solar_wind. 
+
+		chunk_size: int, number of points per chunk. 
+		Only the last chunk may be shorter. 
+
+	Yields: 
+		r_chunk, u_chunk: numpy arrays, the next 
+		radial distance values [km] and solar wind 
+		speed values [km s^-1]. 
+	'''
+
+	if r_stop is not None:
+		#No more steps than it takes to pass r_stop
+		needed = steps_to_radius(r0, r_stop, h)
+		N = needed if N is None else min(N, needed)
+
+	elif N is None:
+		raise Exception('Oops! Either a number of steps N or a stopping radius r_stop is needed!')
+
+	fill = _rk4_filler(backend)
+
+	r = float(r0)
+	f = float(f0)
+	remaining = N + 1	#points still to be yielded
+	skip = 0			#the first chunk yields the initial point, later ones start from the point before
+
+	while remaining > 0:
+		size = min(chunk_size, remaining)
+
+		r_chunk = np.empty(skip + size)
+		f_chunk = np.empty(skip + size)
+		r_chunk[0] = r
+		f_chunk[0] = f
+
+		fill(r_chunk, f_chunk, float(h), skip + size - 1, float(u_c_squared), float(r_c))
+
+		r = r_chunk[-1]
+		f = f_chunk[-1]
+		remaining -= size
+
+		yield r_chunk[skip:], np.sqrt(f_chunk[skip:], out=f_chunk[skip:])
+		skip = 1
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def trim_to_radius(r_vals, f_vals, r_max, include_edge=False):
+	'''
+	This function keeps only the part of a solution 
+	inside r_max (e.g. the orbit of Jupiter), and 
+	turns the speed squared into the speed. 
+
+	Since r_vals is sorted, the cut is found via a 
+	binary search and returned as a view, and the 
+	square root is taken in place, so no copy of 
+	the trajectory is made. Note that f_vals is 
+	overwritten by the speeds. 
+
+	Parameters: 
+		r_vals: numpy array, sorted radial distance 
+		values [km]
+
+		f_vals: numpy array (float64), solar wind 
+		speed values squared [km^2 s^-2]
+
+		r_max: float, radial distance to cut at [km], 
+		only values below it are kept. 
+
+		include_edge: bool, if True the first value 
+		at or past r_max is kept as well, so that 
+		speeds can be interpolated right up to r_max. 
+
+	Returns: 
+		r_vals, u_vals: numpy arrays, radial distance 
+		values [km] and solar wind speed values 
+		[km s^-1] below r_max. 
+	'''
+
+	inside = np.searchsorted(r_vals, r_max, side='left')
+
+	if include_edge and inside < len(r_vals):
+		inside += 1
+
+	u_vals = np.sqrt(f_vals[:inside], out=f_vals[:inside])
+
+	return r_vals[:inside], u_vals
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def RK4_solar_wind_batch(temperatures, h, N, r0_factor=1.01, f0_factor=1.01):
+	'''
+	This function performs the same Runge Kutta 4
+	integration as RK4_solar_wind,
+	but for many coronal temperatures at once. Every
+	trajectory is advanced together with numpy array
+	operations, so there is a single Python loop over
+	the N steps no matter how many temperatures are
+	given.
+
+	Each trajectory starts just past its own critical
+	point, at r_0 = r0_factor * r_c and
+	f_0 = f0_factor * u_c^2.
+
+	Parameters:
+		temperatures: float or numpy array, coronal
+		temperatures in Kelvin. Each value must lie
+		between 0.5 million K and 4 million K.
+
+		h: float, step size [km]
+
+		N: int, number of steps
+
+		r0_factor: float, initial radius in units of
+		the critical radius.
+
+		f0_factor: float, initial speed squared in
+		units of the coronal sound speed squared.
+
+	Returns:
+		r_vals, u_vals: numpy arrays of shape
+		(number of temperatures, N+1), the radial
+		distance values [km] and solar wind speed
+		values [km s^-1] of every trajectory.
+	'''
+
+	temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+
+	#Critical radius & coronal sound speed for every temperature
+	r_c = critical_radius(temperatures)
+	u_c_squared = coronal_sound_speed(temperatures)
+
+	#Step-major storage so every step writes one contiguous row
+	r_vals = np.empty((N+1, len(temperatures)))
+	f_vals = np.empty((N+1, len(temperatures)))
+	r_vals[0] = r0_factor * r_c
+	f_vals[0] = f0_factor * u_c_squared
+
+	for i in range(N):
+		r = r_vals[i]
+		f = f_vals[i]
+
+		k1 = h * df_dr(r, f, u_c_squared, r_c)
+		k2 = h * df_dr(r+0.5*h, f+0.5*k1, u_c_squared, r_c)
+		k3 = h * df_dr(r+0.5*h, f+0.5*k2, u_c_squared, r_c)
+		k4 = h * df_dr(r+ h, f+ k3, u_c_squared, r_c)
+
+		f_vals[i+1] = f + (k1 + 2*k2 + 2*k3 + k4)/6
+		r_vals[i+1] = r + h
+
+
+	return r_vals.T, np.sqrt(f_vals).T
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+#Dormand-Prince 5(4) Butcher tableau used by RK45_solar_wind
+_DP_C = (0, 1/5, 3/10, 4/5, 8/9, 1, 1)
+_DP_A = (
+	(),
+	(1/5,),
+	(3/40, 9/40),
+	(44/45, -56/15, 32/9),
+	(19372/6561, -25360/2187, 64448/6561, -212/729),
+	(9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+	(35/384, 0, 500/1113, 125/192, -2187/6784, 11/84),
+)
+_DP_E = (71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)	#5th minus 4th order weights
+
+
+
+def RK45_solar_wind(r0, f0, r_end, u_c_squared, r_c, rtol=1e-8, atol=1e-6, h0=None, max_steps=100000):
+	'''
+	This function integrates Equation 3 in the 
+	README file with an adaptive step size, via 
+	the embedded Dormand-Prince 5(4) Runge Kutta 
+	method. 
+
+	Each step is taken with a fifth order method, 
+	and the difference to the embedded fourth order 
+	solution estimates the local error. Steps whose 
+	error exceeds atol + rtol*|f| are rejected and 
+	retried smaller, so the step shrinks just past 
+	the critical radius where the solution changes 
+	quickly and grows far out where u(r) is almost 
+	flat. 
+
+	Parameters: 
+		r0: float, initial radial distance [km]
+
+		f0: float, initial solar wind speed 
+		squared [km^2 s^-2]
+
+		r_end: float, radial distance at which to 
+		stop the integration [km]
+
+		u_c_squared: float, the coronal sound speed 
+		in km^2 s^-2.
+
+		r_c: float, critical radius in km.
+
+		rtol: float, relative error tolerance per step.
+
+		atol: float, absolute error tolerance per 
+		step [km^2 s^-2].
+
+		h0: float, initial step size [km]. Defaults 
+		to 0.1% of r0.
+
+		max_steps: int, upper limit on the number 
+		of attempted steps.
+
+	Returns: 
+		r_vals, f_vals: numpy arrays, the non-uniform 
+		radial distance values chosen by the integrator 
+		and the solar wind speed values squared 
+		[km] and [km^2 s^-2].
+	'''
+
+	r = float(r0)
+	f = float(f0)
+	h = 1e-3 * r if h0 is None else float(h0)
+
+	r_vals = [r]
+	f_vals = [f]
+
+	k = [0.0] * 7
+	k[0] = df_dr(r, f, u_c_squared, r_c)
+
+	for step in range(max_steps):
+		if r >= r_end:
+			break
+
+		#Not stepping past the end of our range
+		h = min(h, r_end - r)
+
+		for i in range(1, 7):
+			f_stage = f + h * sum(a * k_j for a, k_j in zip(_DP_A[i], k))
+			k[i] = df_dr(r + _DP_C[i]*h, f_stage, u_c_squared, r_c)
+
+		f_new = f_stage	#the last stage is evaluated at the fifth order solution
+		error = h * sum(e * k_j for e, k_j in zip(_DP_E, k))
+		scale = atol + rtol * max(abs(f), abs(f_new))
+		error_ratio = abs(error) / scale
+
+		if error_ratio <= 1:
+			#Accepting the step, reusing the last stage as the next first stage
+			r = r_end if (r_end - r) <= h else r + h
+			f = f_new
+			k[0] = k[6]
+
+			r_vals.append(r)
+			f_vals.append(f)
+
+		#Standard step size controller, limited to a factor of 0.2 to 5
+		if error_ratio == 0:
+			h *= 5
+		else:
+			h *= min(5, max(0.2, 0.9 * error_ratio**-0.2))
+
+	if r < r_end:
+		raise Exception('Oops! The adaptive integration did not reach the end of its range within max_steps!')
+
+
+	return np.array(r_vals), np.array(f_vals)
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def lambert_w(z, branch=0, max_iter=50):
+	'''
+	This function evaluates the Lambert W function, 
+	the inverse of w*exp(w), element-wise for numpy 
+	arrays. It is used by parker_analytic to write 
+	the transonic Parker solution in closed form. 
+
+	An initial guess (a series about the branch 
+	point z = -1/e, or the logarithmic asymptote 
+	otherwise) is refined with Halley's method. 
+
+	Parameters: 
+		z: float or numpy array, argument of W. Must 
+		be >= -1/e, and < 0 for branch -1. 
+
+		branch: int, 0 for the principal branch 
+		(W >= -1) or -1 for the lower branch (W <= -1). 
+
+		max_iter: int, upper limit on the number of 
+		Halley iterations. 
+
+	Returns: 
+		w: float or numpy array, W(z) on the chosen branch. 
+	'''
+
+	if branch not in (0, -1):
+		raise Exception('Oops! Only the 0 and -1 branches of the Lambert W function are available!')
+
+	z = np.asarray(z, dtype=float)
+
+	with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+
+		#Series about the branch point, used close to z = -1/e
+		p = np.sqrt(np.maximum(2*(np.e*z + 1), 0))
+		sign = 1 if branch == 0 else -1
+		w_branch_point = -1 + sign*p - (p**2)/3 + sign*(11/72)*(p**3)
+
+		#Logarithmic asymptotes, used everywhere else
+		if branch == 0:
+			L1 = np.log(np.maximum(z, 3))
+			L2 = np.log(L1)
+			w_far = np.where(z > 3, L1 - L2 + L2/L1, np.log1p(np.maximum(z, -0.25)))
+		else:
+			L1 = np.log(-z)
+			L2 = np.log(-L1)
+			w_far = L1 - L2 + L2/L1
+
+		w = np.where(z < -0.25, w_branch_point, w_far)
+
+		#Refining via Halley's method
+		for i in range(max_iter):
+			ew = np.exp(w)
+			residual = w*ew - z
+			w_plus_one = w + 1
+			step = residual / (ew*w_plus_one - (w + 2)*residual/(2*w_plus_one))
+			step = np.where(np.isfinite(step), step, 0)
+			w = w - step
+
+			if np.all(np.abs(step) <= 1e-15 * (1 + np.abs(w))):
+				break
+
+	return w[()] 
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def parker_analytic(r, u_c_squared, r_c):
+	'''
+	This function evaluates the exact transonic 
+	solution of Equation 3 in the README file, 
+	with no numerical integration. 
+
+	Integrating Equation 3 with f = u^2 gives 
+
+		w - ln(w) = 4 ln(r/r_c) + 4 r_c/r - 3, w = u^2/u_c^2 
+
+	which is solved by w = -W(-exp(-D)), with D the 
+	right hand side and W the Lambert W function. 
+	The -1 branch gives the supersonic solution 
+	beyond the critical radius, and the 0 branch 
+	the subsonic solution inside of it. 
+
+	Parameters: 
+		r: float or numpy array, radial distance(s) 
+		from the Sun [km]. 
+
+		u_c_squared: float, the coronal sound speed 
+		in km^2 s^-2. 
+
+		r_c: float, critical radius in km. 
+
+	Returns: 
+		u: float or numpy array, solar wind speed at 
+		each radius [km s^-1]. 
+	'''
+
+	r = np.asarray(r, dtype=float)
+
+	D = 4*np.log(r/r_c) + 4*(r_c/r) - 3
+	z = -np.exp(-D)
+
+	w = np.where(r >= r_c, -lambert_w(z, branch=-1), -lambert_w(z, branch=0))
+
+	return np.sqrt(u_c_squared * w)[()]
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+if __name__ == '__main__':
+	print('ParkerSolarWind Function Library Updated.')
 
 
 
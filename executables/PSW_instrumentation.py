@@ -0,0 +1,243 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+from contextlib import contextmanager, nullcontext
+import atexit
+import json
+import time
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Instrumentation>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following optionally records where a run spends its
+time: the wall time of each stage of the program (e.g.
+integration, the Jupiter orbit cutoff, writing files,
+interpolation and plotting), and how many times df_dr is
+evaluated.
+
+The RK4 backend chosen for the run is kept. The compiled
+(numba) RK4 loop never calls df_dr, so when it runs, the
+df_dr count of the report is given as unavailable.
+
+Instrumentation is off unless enable() is called. While
+off, stage() hands back a do-nothing context and df_dr
+is the plain library function, so there is no tracing
+cost at all.
+'''
+
+enabled = False
+
+#Accumulated wall time [s] and number of entries for each stage
+stage_seconds = {}
+stage_counts = {}
+
+#Number of df_dr calls, and of values evaluated (arrays count every element)
+df_dr_calls = 0
+df_dr_evaluations = 0
+
+#Number of RK4 integrations run by the compiled loop, whose df_dr calls are not seen
+compiled_rk4_runs = 0
+
+_plain_df_dr = PSW.df_dr
+_plain_rk4_filler = PSW._rk4_filler
+_null_stage = nullcontext()
+_at_exit = set()	#report handlers already registered with atexit
+
+
+
+def _counting_df_dr(r, f, u_c_squared, r_c):
+	'''
+	This function stands in for PSW.df_dr while
+	instrumentation is on, counting every call
+	before passing it to the real function.
+	'''
+
+	global df_dr_calls, df_dr_evaluations
+
+	result = _plain_df_dr(r, f, u_c_squared, r_c)
+
+	df_dr_calls += 1
+	df_dr_evaluations += np.size(result)
+
+	return result
+
+
+
+def _noting_rk4_filler(backend):
+	'''
+	This function stands in for PSW._rk4_filler
+	while instrumentation is on, noting every RK4
+	integration that runs the compiled loop.
+	'''
+
+	global compiled_rk4_runs
+
+	fill = _plain_rk4_filler(backend)
+
+	if fill is not PSW._rk4_steps:
+		compiled_rk4_runs += 1
+
+	return fill
+
+
+
+@contextmanager
+def _timed_stage(name):
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		stage_seconds[name] = stage_seconds.get(name, 0.0) + (time.perf_counter() - start)
+		stage_counts[name] = stage_counts.get(name, 0) + 1
+
+
+
+def stage(name):
+	'''
+	This function marks one stage of the program,
+	to be used as 'with stage(name): ...'. Its wall
+	time is added to the report when instrumentation
+	is on.
+
+	Parameters:
+		name: str, name of the stage in the report.
+	'''
+
+	if not enabled:
+		return _null_stage
+
+	return _timed_stage(name)
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def enable(report_path=None, print_at_exit=True):
+	'''
+	This function turns instrumentation on, and
+	arranges for the report to be emitted when
+	the program exits. The RK4 backend is left as
+	chosen. Calling it again while already on changes
+	nothing.
+
+	Parameters:
+		report_path: str, JSON file to write the
+		report to at exit, or None.
+
+		print_at_exit: bool, if True the report is
+		also printed at exit.
+	'''
+
+	global enabled
+
+	if not enabled:
+		#Registered only when turned on, and never twice, so the report is emitted once
+		if report_path is not None and ('write', report_path) not in _at_exit:
+			_at_exit.add(('write', report_path))
+			atexit.register(write_report, report_path)
+
+		if print_at_exit and 'print' not in _at_exit:
+			_at_exit.add('print')
+			atexit.register(print_report)
+
+	enabled = True
+	PSW.df_dr = _counting_df_dr	#library functions look df_dr up at call time, so they are counted too
+	PSW._rk4_filler = _noting_rk4_filler
+
+
+
+def disable():
+	'''
+	This function turns instrumentation off again,
+	restoring the plain df_dr.
+	'''
+
+	global enabled
+
+	enabled = False
+	PSW.df_dr = _plain_df_dr
+	PSW._rk4_filler = _plain_rk4_filler
+
+
+
+def reset():
+	'''
+	This function clears every recorded stage
+	time and df_dr count.
+	'''
+
+	global df_dr_calls, df_dr_evaluations, compiled_rk4_runs
+
+	stage_seconds.clear()
+	stage_counts.clear()
+	df_dr_calls = 0
+	df_dr_evaluations = 0
+	compiled_rk4_runs = 0
+
+
+
+def report():
+	'''
+	This function gathers the recorded times
+	and counts.
+
+	Returns:
+		report: dict, with 'stages' (seconds and
+		count per stage, slowest first) and 'df_dr'
+		(number of calls and values evaluated, both
+		None if the compiled RK4 loop ran, along with
+		the number of such 'compiled_rk4_runs').
+	'''
+
+	stages = {name: {'seconds': stage_seconds[name], 'count': stage_counts[name]}
+		for name in sorted(stage_seconds, key=stage_seconds.get, reverse=True)}
+
+	if compiled_rk4_runs:
+		df_dr = {'calls': None, 'evaluations': None, 'compiled_rk4_runs': compiled_rk4_runs}
+	else:
+		df_dr = {'calls': df_dr_calls, 'evaluations': df_dr_evaluations, 'compiled_rk4_runs': 0}
+
+	return {'stages': stages, 'df_dr': df_dr}
+
+
+
+def print_report():
+	'''
+	This function prints the report as a table.
+	'''
+
+	summary = report()
+
+	print('---------------------------------------------')
+	print(f"{'Stage':<28}{'Seconds':>12}{'Count':>6}")
+	for name, entry in summary['stages'].items():
+		print(f"{name:<28}{entry['seconds']:>12.6f}{entry['count']:>6}")
+	if summary['df_dr']['calls'] is None:
+		print('df_dr calls: unavailable, the compiled (numba) RK4 loop does not count them')
+	else:
+		print(f"df_dr calls: {summary['df_dr']['calls']}, values evaluated: {summary['df_dr']['evaluations']}")
+	print('---------------------------------------------')
+
+
+
+def write_report(path):
+	'''
+	This function saves the report as JSON.
+
+	Parameters:
+		path: str, location of the JSON file.
+	'''
+
+	with open(path, 'w') as file:
+		json.dump(report(), file, indent=2)
@@ -0,0 +1,147 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Lookup Table>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following precomputes the solar wind speed u(T, r)
+on a dense grid of coronal temperatures and radial
+distances, covering the documented envelope of the
+program: 0.5 million K to 4 million K, and the critical
+radius out to the orbit of Jupiter (766.44e6 km).
+
+The table is built once via the same batched RK4
+integration (critical_radius, coronal_sound_speed and
+df_dr) as the rest of the program, after which any
+(T, r) pair is found by bilinear interpolation.
+'''
+
+
+
+class LookupTable:
+	'''
+	A table of solar wind speeds on a grid of
+	coronal temperatures and radial distances.
+
+	Grid points that lie inside the starting
+	radius of their temperature's integration
+	(r < 1.01 * r_c) hold NaN.
+
+	Parameters:
+		T_grid: numpy array, sorted coronal
+		temperatures [K].
+
+		r_grid: numpy array, sorted radial
+		distances [km].
+
+		u_table: numpy array of shape (len(T_grid),
+		len(r_grid)), solar wind speeds [km s^-1].
+	'''
+
+	def __init__(self, T_grid, r_grid, u_table):
+		self.T_grid = np.asarray(T_grid, dtype=float)
+		self.r_grid = np.asarray(r_grid, dtype=float)
+		self.u_table = np.asarray(u_table, dtype=float)
+
+
+	@classmethod
+	def build(cls, n_T=351, n_r=2000, h=1e6, T_min=PSW.T_min, T_max=PSW.T_max, r_max=PSW.jupiter_radius):
+		'''
+		This function solves the Parker Solar Wind
+		Equation for every temperature of the grid
+		and samples each solution on the radius grid.
+
+		Parameters:
+			n_T: int, number of temperatures,
+			evenly spaced from T_min to T_max.
+
+			n_r: int, number of radii, spaced
+			geometrically from the smallest starting
+			radius out to r_max, so the grid is
+			densest where u(r) changes fastest.
+
+			h: float, RK4 step size [km]
+
+			T_min, T_max: floats, temperature range [K]
+
+			r_max: float, outer edge of the table [km]
+
+		Returns:
+			table: LookupTable
+		'''
+
+		T_grid = np.linspace(T_min, T_max, n_T)
+		r_0 = 1.01 * PSW.critical_radius(T_grid)
+		r_grid = np.geomspace(r_0.min(), r_max, n_r)
+
+		#Enough steps for the innermost starting (hottest) trajectory to reach r_max
+		N = PSW.steps_to_radius(r_0.min(), r_max, h)
+		r_vals, u_vals = PSW.RK4_solar_wind_batch(T_grid, h, N)
+
+		u_table = np.full((n_T, n_r), np.nan)
+		for i in range(n_T):
+			inside = r_grid >= r_vals[i, 0]
+			u_table[i, inside] = PSW.speed_at(r_grid[inside], r_vals[i], u_vals[i])
+
+		return cls(T_grid, r_grid, u_table)
+
+
+	def query(self, T, r):
+		'''
+		This function finds the solar wind speed for
+		any number of (T, r) pairs by bilinear
+		interpolation within the table. T and r
+		broadcast against each other like numpy arrays.
+
+		Parameters:
+			T: float or numpy array, coronal temperature(s) [K]
+
+			r: float or numpy array, radial distance(s) [km]
+
+		Returns:
+			u: float or numpy array, solar wind speed(s)
+			[km s^-1]. NaN where the query falls inside
+			the starting radius of the integration.
+		'''
+
+		T, r = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(r, dtype=float))
+
+		#Straddling grid points, found via binary search along each axis
+		i0, i1 = PSW.bracketing_indices(self.T_grid, T)
+		j0, j1 = PSW.bracketing_indices(self.r_grid, r)
+
+		t = (T - self.T_grid[i0]) / (self.T_grid[i1] - self.T_grid[i0])
+		s = (r - self.r_grid[j0]) / (self.r_grid[j1] - self.r_grid[j0])
+
+		u = ((1 - t)*(1 - s)*self.u_table[i0, j0] + t*(1 - s)*self.u_table[i1, j0]
+			+ (1 - t)*s*self.u_table[i0, j1] + t*s*self.u_table[i1, j1])
+
+		return u[()]
+
+
+	def save(self, path):
+		'''
+		This function writes the table to a .npz file.
+		'''
+
+		np.savez(path, T_grid=self.T_grid, r_grid=self.r_grid, u_table=self.u_table)
+
+
+	@classmethod
+	def load(cls, path):
+		'''
+		This function reads a table written by save.
+		'''
+
+		with np.load(path) as data:
+			return cls(data['T_grid'], data['r_grid'], data['u_table'])
@@ -0,0 +1,306 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import PSW_executable
+import PSW_cache
+import numpy as np
+import argparse
+import asyncio
+import ipaddress
+import socket
+import json
+from urllib.parse import urlsplit, parse_qs
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Query Service>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following serves "solar wind speed at radius r for
+coronal temperature T" over HTTP on the local machine, so
+other programs can query the model without starting a
+new Python process (and a new integration) every time.
+
+Solutions are kept warm in a PSW_cache.SolutionCache.
+Concurrent requests for a temperature that is still
+being solved all wait on that one solve, rather than
+each starting their own. Integrations run in a worker
+thread, so cached queries are answered meanwhile.
+
+Start the service via:
+
+	python PSW_service.py --port 8040 --warm 4e6,2e6
+
+and query it via e.g.:
+
+	GET  /speed?T=4e6&r=200e6            one radius
+	GET  /speed?T=4e6&r=149e6,228e6      several radii
+	POST /speed  {"T": 4e6, "r": [149e6, 228e6]}
+	GET  /stats                          cache statistics
+
+Every answer is JSON, {"T": ..., "r": [...], "u": [...]}
+with r in km and u in km s^-1, or {"error": ...} along
+with status 400 if the query cannot be answered. The
+service only ever listens on a loopback address.
+'''
+
+#Maximum size of a request body, in bytes
+max_body = 1024**2
+
+
+
+class SolarWindService:
+	'''
+	The solar wind query service: a warm solution
+	cache plus the HTTP handling in front of it.
+
+	Parameters:
+		cache: PSW_cache.SolutionCache, or None for
+		a new one with the default memory budget.
+
+		h: float, RK4 step size [km] of every solve.
+	'''
+
+	def __init__(self, cache=None, h=PSW_executable.h):
+		self.cache = PSW_cache.SolutionCache() if cache is None else cache
+		self.h = h
+		self.coalesced = 0
+		self._pending = {}
+
+
+	async def solution(self, T):
+		'''
+		This function returns the RK4 solution out to
+		the orbit of Jupiter for temperature T, from
+		the cache if possible. Otherwise it is solved
+		in a worker thread, once, however many
+		requests are waiting for it.
+
+		Returns:
+			r_vals, u_vals: numpy arrays (read only),
+			radial distance values [km] and solar wind
+			speed values [km s^-1].
+		'''
+
+		T = float(T)
+
+		#A waiter on a solve already under way is counted as coalesced, not as a cache miss
+		if T in self._pending:
+			self.coalesced += 1
+		else:
+			solution = self.cache.get(T, self.h, None)
+			if solution is not None:
+				return solution
+
+			self._pending[T] = asyncio.ensure_future(self._solve(T))
+
+		#Shielded, so one waiter giving up does not cancel the solve for the others
+		return await asyncio.shield(self._pending[T])
+
+
+	async def _solve(self, T):
+		'''
+		This function integrates one temperature in a
+		worker thread and stores the result. The first
+		point at or past the orbit of Jupiter is kept,
+		so queries can reach right out to it.
+		'''
+
+		try:
+			r_vals, u_vals = await asyncio.get_running_loop().run_in_executor(None, PSW_executable.solve_solar_wind, T, 'RK4', self.h, None, PSW.jupiter_radius, True)
+		finally:
+			del self._pending[T]
+
+		#Stored from the event loop thread only, so the cache needs no locking
+		return self.cache.put(r_vals, u_vals, T, self.h, None)
+
+
+	async def speeds(self, T, radii):
+		'''
+		This function finds the solar wind speed at
+		any number of radii for temperature T.
+
+		Parameters:
+			T: float, coronal temperature in Kelvin.
+
+			radii: list of floats, radial distances [km]
+
+		Returns:
+			u: numpy array, solar wind speed at each
+			radius [km s^-1].
+		'''
+
+		r_vals, u_vals = await self.solution(T)
+
+		return np.atleast_1d(PSW.speed_at(np.asarray(radii, dtype=float), r_vals, u_vals))
+
+
+	async def warm(self, temperatures):
+		'''
+		This function solves a list of temperatures
+		ahead of the first queries.
+		'''
+
+		await asyncio.gather(*(self.solution(T) for T in temperatures))
+
+
+	async def answer(self, method, target, body):
+		'''
+		This function answers one HTTP request.
+
+		Returns:
+			status: int, HTTP status code.
+
+			reply: dict, the JSON answer.
+		'''
+
+		url = urlsplit(target)
+
+		if url.path == '/stats':
+			return 200, dict(self.cache.stats(), coalesced=self.coalesced, pending=len(self._pending))
+
+		if url.path != '/speed':
+			return 404, {'error': 'Oops! The only queries are /speed and /stats!'}
+
+		try:
+			if method == 'GET':
+				query = parse_qs(url.query)
+				T = float(query['T'][0])
+				radii = [float(r) for value in query['r'] for r in value.split(',')]
+
+			elif method == 'POST':
+				query = json.loads(body)
+				T = float(query['T'])
+				radii = [float(r) for r in np.atleast_1d(query['r'])]
+
+			else:
+				return 405, {'error': 'Oops! Only GET and POST queries are supported!'}
+
+			u = await self.speeds(T, radii)
+
+		except (KeyError, IndexError, TypeError, ValueError):
+			return 400, {'error': 'Oops! A query needs a temperature T and one or more radii r!'}
+
+		except Exception as error:
+			return 400, {'error': str(error)}
+
+		return 200, {'T': T, 'r': radii, 'u': u.tolist()}
+
+
+	async def handle(self, reader, writer):
+		'''
+		This function serves one connection, answering
+		requests on it until the client closes it (or
+		asks for it to be closed).
+		'''
+
+		try:
+			while True:
+				request_line = await reader.readline()
+				if not request_line:
+					break
+
+				method, target, version = request_line.decode('latin-1').split()
+
+				headers = {}
+				while True:
+					line = await reader.readline()
+					if line in (b'\r\n', b'\n', b''):
+						break
+					name, _, value = line.decode('latin-1').partition(':')
+					headers[name.strip().lower()] = value.strip()
+
+				length = int(headers.get('content-length', 0))
+
+				if length > max_body:
+					#The body is never read, so the connection cannot carry another request
+					status, reply = 413, {'error': 'Oops! The request body is larger than ' + str(max_body) + ' bytes!'}
+					keep_alive = False
+				else:
+					body = await reader.readexactly(length) if length else b''
+
+					status, reply = await self.answer(method, target, body)
+
+					keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+				payload = json.dumps(reply).encode()
+				writer.write(f'{version} {status} {"OK" if status == 200 else "Error"}\r\n'
+					f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+					f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + payload)
+				await writer.drain()
+
+				if not keep_alive:
+					break
+
+		except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+			pass	#malformed request or client gone, dropping the connection
+
+		finally:
+			writer.close()
+
+
+	async def serve(self, host='127.0.0.1', port=8040, warm=()):
+		'''
+		This function runs the service until it is
+		cancelled.
+
+		Parameters:
+			host: str, loopback address to listen on.
+
+			port: int, port to listen on.
+
+			warm: list of floats, temperatures [K] to
+			solve before accepting queries.
+		'''
+
+		if not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+			raise Exception('Oops! The service only listens on the local machine (e.g. 127.0.0.1)!')
+
+		await self.warm(warm)
+
+		server = await asyncio.start_server(self.handle, host, port)
+
+		print('Serving solar wind speeds on http://' + host + ':' + str(port))
+
+		async with server:
+			await server.serve_forever()
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def main(argv=None):
+	'''
+	This function starts the service from the
+	command line.
+	'''
+
+	parser = argparse.ArgumentParser(description='Local HTTP service for Parker Solar Wind speeds.')
+
+	parser.add_argument('--host', default='127.0.0.1', help='loopback address to listen on')
+	parser.add_argument('--port', type=int, default=8040, help='port to listen on')
+	parser.add_argument('--warm', default='', help='comma separated temperatures [K] to solve at startup')
+	parser.add_argument('--cache-mb', type=float, default=256, help='memory budget of the solution cache [MiB]')
+
+	args = parser.parse_args(argv)
+
+	service = SolarWindService(PSW_cache.SolutionCache(int(args.cache_mb * 1024**2)))
+	warm = [float(T) for T in args.warm.split(',') if T]
+
+	try:
+		asyncio.run(service.serve(args.host, args.port, warm))
+	except KeyboardInterrupt:
+		pass
+
+
+
+if __name__ == '__main__':
+	main()
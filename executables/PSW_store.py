@@ -0,0 +1,531 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import re
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Solution Store>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following saves and loads solar wind solutions
+as binary float64 files, rather than the integer text
+files written by np.savetxt in the PSW_executable.
+
+Every solution is kept as a pair of files sharing
+one name:
+
+	<name>.npy  : a (2, n) float64 array, the r values
+	              [km] in row 0 and the u values
+	              [km s^-1] in row 1, followed by the
+	              metadata as JSON.
+
+	<name>.json : a copy of that metadata, holding the
+	              temperature, h, N and solver used.
+
+The .npy file can be opened with np.load(mmap_mode='r'),
+which ignores the metadata after the array, so other
+processes read the trajectories straight from disk with
+no parsing and no copy. As the data and its metadata
+share one file, a single rename replaces both together.
+
+Very long trajectories can instead be streamed to disk
+chunk by chunk as they are integrated (see
+PSW_function_library.RK4_solar_wind_chunks), either as
+comma separated text or as a raw binary file of float64
+(r, u) pairs, which readers may open while it is still
+being written.
+
+Archived text outputs of the PSW_executable can be read
+back via load_text_solution, which checks their header
+and r grid, and converted into this binary format via
+convert_text_solution (or convert_text_archive for many
+files at once), after which they load without parsing.
+'''
+
+#Header line of the executable's text outputs, old files say [m] although the values are in km
+_text_header = re.compile(r'#\s*R Values \[k?m\]\s*U Values \[k?m s\^-1\]')
+
+
+
+def _paths(path):
+	'''
+	This function gives the data and metadata file
+	paths for a solution name, with or without its
+	.npy extension.
+	'''
+
+	stem = path[:-4] if path.endswith('.npy') else path
+
+	return stem + '.npy', stem + '.json'
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def save_solution(path, r_vals, u_vals, T, h=None, N=None, solver='RK4'):
+	'''
+	This function writes one solution to disk in
+	the binary store format.
+
+	Both files are written under temporary names
+	and then moved into place. The .npy file, which
+	carries the metadata after the array, is moved
+	first: that one rename replaces the data and
+	its metadata together, so readers of
+	load_solution never see a half written solution
+	or a mismatched pair. The .json copy follows.
+
+	Parameters:
+		path: str, file name of the solution, with
+		or without the .npy extension.
+
+		r_vals: numpy array, radial distance values [km]
+
+		u_vals: numpy array, solar wind speed values [km s^-1]
+
+		T: float, coronal temperature in Kelvin.
+
+		h: float, step size of the integration [km]
+
+		N: int, number of steps of the integration
+
+		solver: str, name of the solver used.
+
+	Returns:
+		data_path: str, path of the written .npy file.
+	'''
+
+	data_path, meta_path = _paths(path)
+
+	data = np.empty((2, len(r_vals)), dtype=np.float64)
+	data[0] = r_vals
+	data[1] = u_vals
+
+	metadata = {'temperature': float(T), 'h': None if h is None else float(h),
+		'N': None if N is None else int(N), 'solver': solver, 'length': len(r_vals),
+		'units': {'r': 'km', 'u': 'km s^-1'}}
+
+	with open(data_path + '.tmp', 'wb') as file:
+		np.save(file, data)
+		file.write(json.dumps(metadata).encode())	#after the array, where np.load does not look
+	with open(meta_path + '.tmp', 'w') as file:
+		json.dump(metadata, file)
+
+	os.replace(data_path + '.tmp', data_path)
+	os.replace(meta_path + '.tmp', meta_path)
+
+	return data_path
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def load_solution(path, mmap=True):
+	'''
+	This function reads one solution written by
+	save_solution. The array and the metadata are
+	both read from the one open .npy file, so they
+	always belong together, even while the solution
+	is being replaced. Files without metadata after
+	the array (saved by earlier versions) use the
+	.json file instead.
+
+	Parameters:
+		path: str, file name of the solution, with
+		or without the .npy extension.
+
+		mmap: bool, if True the arrays are memory
+		mapped read only views of the file rather
+		than copies in memory.
+
+	Returns:
+		r_vals, u_vals: numpy arrays, radial distance
+		values [km] and solar wind speed values [km s^-1].
+
+		metadata: dict, the temperature, h, N and
+		solver of the solution.
+	'''
+
+	data_path, meta_path = _paths(path)
+
+	with open(data_path, 'rb') as file:
+		version = np.lib.format.read_magic(file)
+		if version == (1, 0):
+			shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+		else:
+			shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+
+		offset = file.tell()
+		count = int(np.prod(shape))
+		order = 'F' if fortran_order else 'C'
+
+		if mmap:
+			data = np.memmap(file, dtype=dtype, mode='r', shape=shape, offset=offset, order=order)
+		else:
+			data = np.fromfile(file, dtype=dtype, count=count).reshape(shape, order=order)
+
+		file.seek(offset + count*dtype.itemsize)
+		trailer = file.read()
+
+	if trailer:
+		metadata = json.loads(trailer)
+	else:
+		with open(meta_path) as file:
+			metadata = json.load(file)
+
+	return data[0], data[1], metadata
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+class SolutionStore:
+	'''
+	A directory of solutions in the binary store
+	format, named by the inputs of the solve so that
+	later runs and other processes can find them.
+
+	Parameters:
+		directory: str, folder holding the solutions.
+		It is created if it does not exist.
+	'''
+
+	def __init__(self, directory):
+		self.directory = directory
+		os.makedirs(directory, exist_ok=True)
+
+
+	def path(self, T, h, N, solver='RK4'):
+		'''
+		This function gives the file name used for
+		the solution with the given inputs. N may be
+		None, for solves that stop at a radius rather
+		than after a number of steps.
+		'''
+
+		steps = 'auto' if N is None else int(N)
+
+		return os.path.join(self.directory, f'PSW_{solver}_T{float(T)!r}_h{float(h)!r}_N{steps}.npy')
+
+
+	def put(self, r_vals, u_vals, T, h, N, solver='RK4'):
+		'''
+		This function saves a solution under the
+		name given by its inputs. See save_solution.
+		'''
+
+		return save_solution(self.path(T, h, N, solver), r_vals, u_vals, T, h, N, solver)
+
+
+	def get(self, T, h, N, solver='RK4', mmap=True):
+		'''
+		This function loads the solution with the
+		given inputs, if it has been stored.
+
+		Returns:
+			r_vals, u_vals: numpy arrays, or None, None
+			if there is no such solution in the store.
+		'''
+
+		path = self.path(T, h, N, solver)
+
+		if not os.path.exists(path):
+			return None, None
+
+		r_vals, u_vals, metadata = load_solution(path, mmap)
+
+		return r_vals, u_vals
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def stream_to_csv(chunks, path, fmt='%.17g'):
+	'''
+	This function writes (r, u) chunks to a comma
+	separated text file as they arrive, flushing
+	after every chunk so readers can follow along.
+
+	Parameters:
+		chunks: iterable of (r_chunk, u_chunk) numpy
+		arrays, e.g. from RK4_solar_wind_chunks.
+
+		path: str, location of the text file.
+
+		fmt: str, number format of each value. The
+		default keeps full float64 precision.
+
+	Returns:
+		length: int, number of rows written.
+	'''
+
+	length = 0
+
+	with open(path, 'w') as file:
+		file.write('# R Values [km] U Values [km s^-1]\n')
+
+		for r_chunk, u_chunk in chunks:
+			np.savetxt(file, np.column_stack((r_chunk, u_chunk)), delimiter=',', fmt=fmt)
+			file.flush()
+			length += len(r_chunk)
+
+	return length
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def stream_to_binary(chunks, path, T=None, h=None, N=None, solver='RK4'):
+	'''
+	This function appends (r, u) chunks to a raw
+	binary file of little endian float64 pairs as
+	they arrive. A .json metadata header (as in
+	save_solution) is written next to it, with the
+	final length filled in once the stream ends.
+
+	Parameters:
+		chunks: iterable of (r_chunk, u_chunk) numpy
+		arrays, e.g. from RK4_solar_wind_chunks.
+
+		path: str, location of the binary file,
+		conventionally ending in .f64.
+
+		T, h, N, solver: metadata of the solution,
+		see save_solution.
+
+	Returns:
+		length: int, number of (r, u) pairs written.
+	'''
+
+	meta_path = os.path.splitext(path)[0] + '.json'
+	metadata = {'temperature': None if T is None else float(T), 'h': None if h is None else float(h),
+		'N': None if N is None else int(N), 'solver': solver, 'length': None,
+		'layout': 'interleaved little endian float64 (r, u) pairs', 'units': {'r': 'km', 'u': 'km s^-1'}}
+
+	with open(meta_path, 'w') as file:
+		json.dump(metadata, file)
+
+	length = 0
+	pair = np.empty((0, 2), dtype='<f8')
+
+	with open(path, 'wb') as file:
+		for r_chunk, u_chunk in chunks:
+			if len(pair) != len(r_chunk):
+				pair = np.empty((len(r_chunk), 2), dtype='<f8')
+			pair[:, 0] = r_chunk
+			pair[:, 1] = u_chunk
+
+			file.write(pair.tobytes())
+			file.flush()
+			length += len(r_chunk)
+
+	metadata['length'] = length
+	with open(meta_path + '.tmp', 'w') as file:
+		json.dump(metadata, file)
+	os.replace(meta_path + '.tmp', meta_path)
+
+	return length
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def load_stream(path):
+	'''
+	This function memory maps a binary file written
+	by stream_to_binary. It may be called while the
+	stream is still being written, in which case
+	only the pairs written so far are seen.
+
+	Parameters:
+		path: str, location of the binary file.
+
+	Returns:
+		r_vals, u_vals: numpy arrays (read only
+		memory maps), radial distance values [km]
+		and solar wind speed values [km s^-1].
+	'''
+
+	length = os.path.getsize(path) // 16	#complete (r, u) pairs only
+
+	if length == 0:
+		return np.empty(0), np.empty(0)
+
+	data = np.memmap(path, dtype='<f8', mode='r', shape=(length, 2))
+
+	return data[:, 0], data[:, 1]
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def load_text_solution(path):
+	'''
+	This function reads a text output of the
+	PSW_executable (e.g. the Mars test case), after
+	checking that it starts with the
+	'# R Values ... U Values ...' header and that its
+	r values strictly increase.
+
+	Only the first two lines are read in Python. The
+	rest is parsed by path in one call to numpy's
+	compiled reader: as integers when the first row
+	holds whole numbers (as the executable writes
+	them, with fmt='%d'), which parses faster than
+	as floats, and as floats otherwise (e.g. files
+	written by stream_to_csv). The values come back
+	as contiguous float64 arrays, ready for speed_at,
+	closest_points or euler_method_parker.
+
+	Parameters:
+		path: str, location of the text file.
+
+	Returns:
+		r_vals, u_vals: numpy arrays, radial distance
+		values [km] and solar wind speed values [km s^-1].
+	'''
+
+	with open(path) as file:
+		header = file.readline()
+		first_row = file.readline()
+
+	if not _text_header.match(header):
+		raise Exception('Oops! ' + path + ' does not start with the # R Values ... U Values ... header!')
+
+	dtype = np.float64 if any(character in first_row for character in '.eEn') else np.int64
+
+	try:
+		data = np.loadtxt(path, delimiter=',', skiprows=1, dtype=dtype, ndmin=2)
+	except ValueError:
+		if dtype is np.float64:
+			raise
+		data = np.loadtxt(path, delimiter=',', skiprows=1, dtype=np.float64, ndmin=2)	#a later row is not a whole number
+
+	if data.shape[1] != 2 or len(data) < 2:
+		raise Exception('Oops! ' + path + ' must hold two columns and at least two rows!')
+
+	r_vals, u_vals = np.ascontiguousarray(data.T, dtype=np.float64)
+
+	if not np.all(r_vals[1:] > r_vals[:-1]):
+		raise Exception('Oops! The r values of ' + path + ' do not strictly increase!')
+
+	return r_vals, u_vals
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def convert_text_solution(text_path, path=None, T=None, h=None, N=None, solver='RK4'):
+	'''
+	This function converts one text output into
+	the binary store format.
+
+	Parameters:
+		text_path: str, location of the text file.
+
+		path: str, file name of the binary solution,
+		defaults to text_path with a .npy extension.
+
+		T: float, coronal temperature in Kelvin. The
+		text files do not record it, so by default it
+		is worked out from the first r value, which is
+		1.01 times the critical radius. This is only
+		as exact as the integer r values allow.
+
+		h, N, solver: metadata of the solution, see
+		save_solution.
+
+	Returns:
+		data_path: str, path of the written .npy file.
+	'''
+
+	r_vals, u_vals = load_text_solution(text_path)
+
+	if path is None:
+		path = os.path.splitext(text_path)[0] + '.npy'
+
+	if T is None:
+		T = PSW.T_0 * PSW.solar_radius / (r_vals[0] / 1.01)
+
+	return save_solution(path, r_vals, u_vals, T, h, N, solver)
+
+
+
+def _convert_one(args):
+	'''
+	This function converts one file inside the
+	worker processes of convert_text_archive.
+	'''
+
+	return convert_text_solution(*args)
+
+
+
+def convert_text_archive(text_paths, directory=None, max_workers=None, **metadata):
+	'''
+	This function converts many text outputs into
+	the binary store format, spreading the files
+	over a pool of worker processes.
+
+	Parameters:
+		text_paths: list of str, locations of the
+		text files.
+
+		directory: str, folder for the binary files,
+		or None to write each next to its text file.
+
+		max_workers: int, number of worker processes.
+		Defaults to the number of CPUs; 1 converts
+		everything in the current process.
+
+		metadata: T, h, N and/or solver, passed on to
+		convert_text_solution for every file.
+
+	Returns:
+		data_paths: list of str, paths of the written
+		.npy files, in the order of text_paths.
+	'''
+
+	if directory is not None:
+		os.makedirs(directory, exist_ok=True)
+
+	jobs = []
+	for text_path in text_paths:
+		path = None
+		if directory is not None:
+			path = os.path.join(directory, os.path.splitext(os.path.basename(text_path))[0] + '.npy')
+
+		jobs.append((text_path, path, metadata.get('T'), metadata.get('h'), metadata.get('N'), metadata.get('solver', 'RK4')))
+
+	if max_workers == 1 or len(jobs) <= 1:
+		return [_convert_one(job) for job in jobs]
+
+	with ProcessPoolExecutor(max_workers=max_workers) as executor:
+		return list(executor.map(_convert_one, jobs))
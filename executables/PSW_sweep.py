@@ -0,0 +1,155 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+from math import *
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Parameter Sweep>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following solves the Parker Solar Wind Equation
+over a whole grid of coronal temperatures and radial
+distances, rather than the single temperature and
+radius set in the PSW_executable.
+
+The temperatures are split into chunks, and every
+chunk is solved in its own worker process. Within
+a chunk, all temperatures are solved together via
+the vectorized functions of the PSW_function_library.
+'''
+
+#Record layout of the sweep results
+sweep_dtype = np.dtype([('temperature', 'f8'), ('radius', 'f8'), ('speed', 'f8')])
+
+
+
+def _solve_chunk(args):
+	'''
+	This function solves one chunk of coronal
+	temperatures and finds the solar wind speed
+	at every requested radius. It is run inside
+	the worker processes of sweep.
+
+	Parameters:
+		args: tuple, (temperatures, radii, solver, h, N)
+		as described in sweep.
+
+	Returns:
+		speeds: numpy array of shape (number of
+		temperatures, number of radii), solar wind
+		speeds [km s^-1].
+	'''
+
+	temperatures, radii, solver, h, N = args
+
+	if solver == 'RK4':
+		#All temperatures of the chunk integrated in one pass
+		r_vals, u_vals = PSW.RK4_solar_wind_batch(temperatures, h, N)
+		speeds = np.array([PSW.speed_at(radii, r_vals[i], u_vals[i]) for i in range(len(temperatures))])
+
+	elif solver == 'RK45':
+		r_c = PSW.critical_radius(temperatures)
+		u_c_squared = PSW.coronal_sound_speed(temperatures)
+
+		speeds = np.empty((len(temperatures), len(radii)))
+		for i in range(len(temperatures)):
+			r_vals, f_vals = PSW.RK45_solar_wind(r_c[i]*1.01, u_c_squared[i]*1.01, radii.max(), u_c_squared[i], r_c[i])
+			speeds[i] = PSW.speed_at(radii, r_vals, np.sqrt(f_vals))
+
+	elif solver == 'analytic':
+		#Every (temperature, radius) pair evaluated at once via broadcasting
+		r_c = PSW.critical_radius(temperatures)[:, None]
+		u_c_squared = PSW.coronal_sound_speed(temperatures)[:, None]
+		speeds = PSW.parker_analytic(radii[None, :], u_c_squared, r_c)
+
+	else:
+		raise Exception('Oops! Your solver choice is not one of our available options!')
+
+	return speeds
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def sweep(temperatures, radii, solver='RK4', h=1e6, N=None, max_workers=None, chunk_size=None):
+	'''
+	This function finds the solar wind speed for
+	every combination of coronal temperature and
+	radial distance, spreading the temperatures
+	over a pool of worker processes.
+
+	Parameters:
+		temperatures: numpy array, coronal temperatures
+		in Kelvin, each between 0.5 million K and
+		4 million K.
+
+		radii: numpy array, radial distances at which
+		to find the solar wind speed [km].
+
+		solver: str, 'RK4', 'RK45' or 'analytic', as
+		in the PSW_executable.
+
+		h: float, RK4 step size [km]
+
+		N: int, number of RK4 steps, or None to take
+		just enough steps to reach the largest radius.
+
+		max_workers: int, number of worker processes.
+		Defaults to the number of CPUs; 1 solves
+		everything in the current process.
+
+		chunk_size: int, number of temperatures handed
+		to a worker at a time. Defaults to one chunk
+		per worker, which keeps the vectorized batches
+		as large as possible.
+
+	Returns:
+		results: numpy structured array with fields
+		'temperature' [K], 'radius' [km] and 'speed'
+		[km s^-1], one record per (temperature, radius)
+		pair, ordered by temperature then radius.
+	'''
+
+	temperatures = np.atleast_1d(np.asarray(temperatures, dtype=float))
+	radii = np.atleast_1d(np.asarray(radii, dtype=float))
+
+	#Checking every temperature up front, before any work is sent out
+	r_0 = 1.01 * PSW.critical_radius(temperatures)
+
+	if N is None:
+		#Enough steps for the innermost starting (hottest) temperature to reach the largest radius
+		N = PSW.steps_to_radius(r_0.min(), radii.max(), h)
+
+	if max_workers is None:
+		max_workers = os.cpu_count() or 1
+
+	if chunk_size is None:
+		chunk_size = max(1, ceil(len(temperatures) / max_workers))
+
+	chunks = [(temperatures[i:i+chunk_size], radii, solver, h, N) for i in range(0, len(temperatures), chunk_size)]
+
+	if max_workers == 1:
+		speeds = [_solve_chunk(chunk) for chunk in chunks]
+	else:
+		with ProcessPoolExecutor(max_workers=max_workers) as executor:
+			speeds = list(executor.map(_solve_chunk, chunks))
+
+	#Collecting every chunk into one table
+	results = np.empty(len(temperatures)*len(radii), dtype=sweep_dtype)
+	results['temperature'] = np.repeat(temperatures, len(radii))
+	results['radius'] = np.tile(radii, len(temperatures))
+	results['speed'] = np.concatenate(speeds, axis=0).ravel()
+
+	return results
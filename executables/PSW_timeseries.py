@@ -0,0 +1,253 @@
+#!usr/local/Anaconda2023/bin/python3.11
+
+import PSW_function_library as PSW
+import numpy as np
+from collections import OrderedDict
+import argparse
+import sys
+
+
+################################################################
+#
+# Parker Solar Wind Model, Final Project
+# File: <Time Series Driver>
+# Author: <Kaycee Conder>
+# Spring 2025 ASTR4610
+#
+################################################################
+
+'''
+The following turns a time series of coronal
+temperatures, i.e. (timestamp, T) records, into a time
+series of solar wind speeds at a fixed set of radii
+(by default the orbits of Earth, Mars and Jupiter).
+
+Records are read and answered in blocks: the new
+temperatures of a block are all integrated together via
+RK4_solar_wind_batch, and the block's results are emitted
+before the next block is read. Standard input (e.g. a
+live feed) is answered one record at a time by default,
+so every result appears as soon as its record arrives;
+files are read in blocks of 256. A temperature within the
+tolerance of the one before it reuses that solution, and
+previously seen temperatures are remembered, so steady
+or repeating inputs are not solved again.
+
+Run it from the command line via e.g.:
+
+	python PSW_timeseries.py temperatures.csv --output speeds.csv --tolerance 1e3
+
+where every line of temperatures.csv holds a timestamp
+and a temperature in Kelvin, separated by a comma.
+'''
+
+#Bodies of the output time series, see PSW.planet_radii
+default_bodies = ('Earth', 'Mars', 'Jupiter')
+
+
+
+def read_records(source):
+	'''
+	This function reads (timestamp, T) records one
+	line at a time, from a file or any iterable of
+	lines. Blank lines, lines starting with '#', and
+	a header line whose temperature is not a number
+	are skipped.
+
+	Parameters:
+		source: str (path of the file) or iterable of
+		str, with 'timestamp,T' on every line.
+
+	Yields:
+		timestamp, T: str & float, the time stamp
+		(kept as written) and coronal temperature [K]
+	'''
+
+	lines = open(source) if isinstance(source, str) else source
+
+	try:
+		for number, line in enumerate(lines):
+			line = line.strip()
+			if not line or line.startswith('#'):
+				continue
+
+			timestamp, _, T = line.rpartition(',')
+
+			try:
+				T = float(T)
+			except ValueError:
+				if number == 0:
+					continue	#column names
+				raise Exception('Oops! Line ' + str(number+1) + ' does not end in a temperature: ' + line)
+
+			yield timestamp.strip(), T
+
+	finally:
+		if lines is not source:
+			lines.close()
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def drive(records, radii=tuple(PSW.planet_radii[body] for body in default_bodies), tolerance=0.0, h=1e6, block_size=256, max_entries=100000):
+	'''
+	This function finds the solar wind speed at
+	every radius for each (timestamp, T) record,
+	yielding results as they are found.
+
+	Parameters:
+		records: iterable of (timestamp, T) pairs, e.g.
+		from read_records. T is in Kelvin, between
+		0.5 million K and 4 million K.
+
+		radii: sequence of floats, radial distances at
+		which to find the speed [km]
+
+		tolerance: float, largest change in temperature
+		[K] from the last solved temperature for which
+		that solution is reused. 0 only reuses exact
+		repeats.
+
+		h: float, RK4 step size [km]
+
+		block_size: int, number of records read before
+		solving. 1 answers every record as soon as it
+		arrives, larger blocks solve faster in bulk.
+
+		max_entries: int, number of solved temperatures
+		remembered; the least recently used are dropped.
+
+	Yields:
+		timestamp, T_solved, speeds: the time stamp of
+		the record, the temperature actually solved for
+		[K] (within the tolerance of the record's), and
+		a numpy array of the speed at each radius
+		[km s^-1].
+	'''
+
+	radii = np.asarray(radii, dtype=float)
+	r_max = radii.max()
+
+	known = OrderedDict()	#solved temperature -> speeds at the radii
+	T_solved = None
+
+	block = []
+	records = iter(records)
+
+	while True:
+		for timestamp, T in records:
+			block.append((timestamp, float(T)))
+			if len(block) == block_size:
+				break
+
+		if not block:
+			return
+
+		#The temperature each record is answered with, following the tolerance
+		solved = []
+		for timestamp, T in block:
+			if T_solved is None or abs(T - T_solved) > tolerance:
+				T_solved = T
+			solved.append(T_solved)
+
+		#Every new temperature of the block integrated together
+		new = np.array(sorted(set(T for T in solved if T not in known)))
+
+		if len(new):
+			r_0 = 1.01 * PSW.critical_radius(new)
+			r_vals, u_vals = PSW.RK4_solar_wind_batch(new, h, PSW.steps_to_radius(r_0.min(), r_max, h))
+
+			for i, T in enumerate(new):
+				known[float(T)] = PSW.speed_at(radii, r_vals[i], u_vals[i])
+
+		for (timestamp, T), T_answer in zip(block, solved):
+			known.move_to_end(T_answer)
+			yield timestamp, T_answer, known[T_answer]
+
+		while len(known) > max_entries:
+			known.popitem(last=False)
+
+		block = []
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def write_results(results, file, names=default_bodies, flush_every=256):
+	'''
+	This function writes the results of drive as
+	comma separated text, one line per record,
+	flushing as it goes.
+
+	Parameters:
+		results: iterable of (timestamp, T_solved,
+		speeds), from drive.
+
+		file: open text file (e.g. sys.stdout).
+
+		names: sequence of str, column name of each
+		radius.
+
+		flush_every: int, number of records written
+		between flushes, e.g. the block size of drive.
+
+	Returns:
+		count: int, number of records written.
+	'''
+
+	file.write('# timestamp,T_solved [K],' + ','.join('u_' + name + ' [km s^-1]' for name in names) + '\n')
+
+	count = 0
+	for timestamp, T, speeds in results:
+		file.write(timestamp + ',' + repr(T) + ',' + ','.join(f'{u:.6f}' for u in speeds) + '\n')
+		count += 1
+
+		if count % flush_every == 0:
+			file.flush()
+
+	file.flush()
+
+	return count
+
+
+
+#----------------------------------------------------------------------------------------------------------------------------------------------
+
+
+
+def main(argv=None):
+	'''
+	This function runs the time series driver from
+	the command line.
+	'''
+
+	parser = argparse.ArgumentParser(description='Solar wind speed time series at Earth, Mars & Jupiter from a coronal temperature time series.')
+
+	parser.add_argument('input', nargs='?', default='-', help="file of 'timestamp,T' lines, or '-' for standard input")
+	parser.add_argument('--output', default='-', help="output text file, or '-' for standard output")
+	parser.add_argument('--tolerance', type=float, default=0.0, help='temperature change [K] within which a solution is reused')
+	parser.add_argument('--block-size', type=int, default=None, help='records solved together; 1 answers every record immediately (default 1 for standard input, 256 for a file)')
+
+	args = parser.parse_args(argv)
+
+	if args.block_size is None:
+		args.block_size = 1 if args.input == '-' else 256	#a live feed must not wait for a whole block
+
+	records = read_records(sys.stdin if args.input == '-' else args.input)
+	results = drive(records, tolerance=args.tolerance, block_size=args.block_size)
+
+	if args.output == '-':
+		return write_results(results, sys.stdout, flush_every=args.block_size)
+
+	with open(args.output, 'w') as file:
+		return write_results(results, file, flush_every=args.block_size)
+
+
+
+if __name__ == '__main__':
+	main()